@@ -0,0 +1,152 @@
+import argparse
+import glob
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Out-of-core aggregation of game logs (gamelogs.py) into one row per player-season.
+# The files are read in chunks and folded into small accumulators (sums and counts per
+# player-season, plus the last ROLLING_WINDOW games of each player), so peak memory
+# depends on the number of player-seasons and the chunk size, never on the number of rows.
+#
+# The output uses the Basketball-Reference per-game column names (Player, Age, Team, G,
+# MP, PTS, FG%, 3P%, FT%), so main.py can read it instead of
+# nba_stats_per_game_regular_season.csv and produce the same final dataset.
+
+KEYS = ["player_id", "Season"]
+SUM_COLS = ["MP", "FG", "FGA", "3P", "3PA", "FT", "FTA", "PTS"]
+ROLLING_WINDOW = 10
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def read_chunks(paths, chunksize, season=None):
+    needed = set(KEYS + SUM_COLS + ["Player", "Team", "Date", "Status"])
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=lambda c: c in needed):
+            if season is not None:
+                chunk = chunk[chunk["Season"] == season].copy()
+            # Older seasons have no three-point columns
+            for col in SUM_COLS:
+                if col not in chunk.columns:
+                    chunk[col] = 0.0
+            if "Status" not in chunk.columns:
+                chunk["Status"] = np.where(chunk["MP"].notna(), "Played", "Did Not Play")
+            yield chunk
+
+
+def fold(acc, part):
+    # Add a partial aggregate into the running one (both indexed by the same keys)
+    if acc is None:
+        return part
+    return acc.add(part, fill_value=0)
+
+
+def aggregate_game_logs(paths, chunksize=DEFAULT_CHUNKSIZE, window=ROLLING_WINDOW, season=None):
+    # season: only aggregate that season's games (default: every season in the files)
+    sums = None        # per player-season: stat sums, games played, games on roster
+    team_games = None  # per player-season-team: games played (to find the main team)
+    names = {}         # player_id -> name
+    tail = None        # last `window` played games of every player-season
+
+    for chunk in read_chunks(paths, chunksize, season):
+        names.update(zip(chunk["player_id"], chunk["Player"]))
+        played = chunk[chunk["Status"] == "Played"]
+
+        part = pd.concat([
+            played.groupby(KEYS)[SUM_COLS].sum(),
+            played.groupby(KEYS).size().rename("G"),
+            chunk.groupby(KEYS).size().rename("Roster_Games"),
+        ], axis=1)
+        sums = fold(sums, part.fillna(0))
+
+        team_part = played.groupby(KEYS + ["Team"]).size()
+        team_games = fold(team_games, team_part)
+
+        recent = pd.concat([tail, played[KEYS + ["Date", "PTS", "MP"]]]) if tail is not None \
+            else played[KEYS + ["Date", "PTS", "MP"]]
+        tail = recent.sort_values("Date", kind="stable").groupby(KEYS).tail(window)
+
+    if sums is None:
+        raise ValueError("No game log rows found.")
+
+    out = pd.DataFrame(index=sums.index)
+    games = sums["G"].replace(0, np.nan)
+    out["Player"] = [names[player_id] for player_id in sums.index.get_level_values("player_id")]
+    # Main team = the team he played the most games for (same rule as main.py)
+    main_team = team_games.sort_values(ascending=False).reset_index().drop_duplicates(KEYS)
+    out["Team"] = main_team.set_index(KEYS)["Team"]
+    out["G"] = sums["G"].astype(int)
+    out["MP"] = (sums["MP"] / games).round(1)
+    out["PTS"] = (sums["PTS"] / games).round(1)
+    # Shooting percentages weighted by attempts, not averaged per game
+    out["FG%"] = (sums["FG"] / sums["FGA"].replace(0, np.nan)).round(3)
+    out["3P%"] = (sums["3P"] / sums["3PA"].replace(0, np.nan)).round(3)
+    out["FT%"] = (sums["FT"] / sums["FTA"].replace(0, np.nan)).round(3)
+
+    # Game-log only features
+    last = tail.groupby(KEYS)[["PTS", "MP"]].mean()
+    out[f"PTS_last{window}"] = last["PTS"].round(1)
+    out[f"MP_last{window}"] = last["MP"].round(1)
+    out["MP_Trend"] = (out[f"MP_last{window}"] - out["MP"]).round(1)
+    out["Availability"] = (sums["G"] / sums["Roster_Games"]).round(3)
+    return out.reset_index()
+
+
+def table_season(path):
+    # Season of an advanced stats table from its file name (nba_advanced_stats_2025.csv -> 2025)
+    digits = re.findall(r"(\d{4})", Path(path).stem)
+    if not digits:
+        raise ValueError(f"No season in '{path}': pass --advanced-season")
+    return int(digits[-1])
+
+
+def add_age(player_seasons, advanced_csv, season=None):
+    # Game logs have no age column: take it from the advanced stats table, joined on
+    # (Player, Season). Seasons the table does not cover get the player's age in the
+    # closest season it does cover, shifted by the difference in seasons.
+    ages = pd.read_csv(advanced_csv, usecols=lambda c: c in ("Player", "Age", "Season")).dropna()
+    if "Season" not in ages.columns:
+        ages["Season"] = season or table_season(advanced_csv)
+    ages = ages.drop_duplicates(["Player", "Season"])
+    out = player_seasons.merge(ages, on=["Player", "Season"], how="left")
+
+    missing = out["Age"].isna()
+    if missing.any():
+        known = out.loc[missing, ["Player", "Season"]].reset_index().merge(
+            ages.rename(columns={"Season": "Known_Season"}), on="Player")
+        known["Gap"] = (known["Season"] - known["Known_Season"]).abs()
+        closest = known.sort_values("Gap", kind="stable").drop_duplicates("index").set_index("index")
+        out.loc[closest.index, "Age"] = closest["Age"] + closest["Season"] - closest["Known_Season"]
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate game logs into per-player-season stats.")
+    parser.add_argument("--gamelogs", default="data/gamelogs/gamelogs_*.csv", help="Glob of game log CSVs.")
+    parser.add_argument("--advanced", default="data/nba_advanced_stats_2025.csv")
+    parser.add_argument("--advanced-season", type=int, default=None,
+                        help="Season of the --advanced table (default: from its file name).")
+    parser.add_argument("--season", type=int, default=None,
+                        help="Only aggregate this season (default: every season in the game logs).")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--window", type=int, default=ROLLING_WINDOW)
+    parser.add_argument("--output", default="data/player_seasons_from_gamelogs.csv")
+    args = parser.parse_args(argv)
+
+    paths = sorted(glob.glob(args.gamelogs))
+    print(f"Aggregating {len(paths)} game log files...")
+    df = aggregate_game_logs(paths, chunksize=args.chunksize, window=args.window, season=args.season)
+    if args.advanced:
+        df = add_age(df, args.advanced, args.advanced_season)
+    # Same column order as the per-game table, extra game-log features at the end
+    first = ["Player", "Age", "Team", "G", "MP", "PTS", "FG%", "3P%", "FT%"]
+    df = df[[c for c in first if c in df.columns] + [c for c in df.columns if c not in first]]
+    df.to_csv(args.output, index=False)
+    print(f"{len(df)} player-seasons saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Typed columnar store for the tables passed between stages
+# (main.py -> k-means.py -> randomforest.py).
+# Each artifact is one Parquet file in data/: dtypes survive the round trip, there is no
+# junk index column and readers can ask for a subset of columns (only those are read).
+
+ARTIFACT_DIR = Path("data")
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def artifact_path(name, artifact_dir=ARTIFACT_DIR):
+    return Path(artifact_dir) / f"{name}.parquet"
+
+
+def save_artifact(df, name, artifact_dir=ARTIFACT_DIR, csv=False):
+    path = artifact_path(name, artifact_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, path)
+    # Optional CSV copy for tools outside the pipeline (e.g. Tableau)
+    if csv:
+        df.to_csv(path.with_suffix(".csv"), index=False)
+    return path
+
+
+def load_artifact(name, columns=None, artifact_dir=ARTIFACT_DIR):
+    path = artifact_path(name, artifact_dir)
+    if path.exists():
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    # Older runs only left the CSV hand-off behind
+    csv_path = path.with_suffix(".csv")
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Artifact '{name}' not found in {Path(artifact_dir)}")
+    df = pd.read_csv(csv_path, usecols=columns)
+    return df.loc[:, ~df.columns.str.startswith("Unnamed:")]
+
+
+def iter_table(path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    # Chunks of a Parquet or CSV file, never the whole table in memory
+    path = Path(path)
+    if path.suffix == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize):
+            yield chunk.loc[:, ~chunk.columns.str.startswith("Unnamed:")]
+
+
+def iter_artifact(name, columns=None, chunksize=DEFAULT_CHUNKSIZE, artifact_dir=ARTIFACT_DIR):
+    path = artifact_path(name, artifact_dir)
+    if not path.exists():
+        path = path.with_suffix(".csv")
+    if not path.exists():
+        raise FileNotFoundError(f"Artifact '{name}' not found in {Path(artifact_dir)}")
+    return iter_table(path, columns=columns, chunksize=chunksize)
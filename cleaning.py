@@ -0,0 +1,148 @@
+import pandas as pd
+
+from aggregate import table_season
+from artifacts import save_artifact
+from dedupe import resolve_multi_team
+from names import merge_on_player
+
+#-- PHASE 1: PREPARING AND CLEANING THE DATA --
+# Builds the final dataset (stats + salaries + Win_Pct) from the scraped CSVs.
+
+STATS_PER_GAME_FILE = "data/nba_stats_per_game_regular_season.csv"
+ADVANCED_STATS_FILE = "data/nba_advanced_stats_2025.csv"
+STANDINGS_FILE = "data/expanded_standings.csv"
+SALARIES_FILE = "data/nba_salaries_2024_2025_raw.csv"
+
+TEAM_MAP = {
+    'Atlanta Hawks': 'ATL', 'Boston Celtics': 'BOS', 'Brooklyn Nets': 'BRK',
+    'Charlotte Hornets': 'CHO', 'Chicago Bulls': 'CHI', 'Cleveland Cavaliers': 'CLE',
+    'Dallas Mavericks': 'DAL', 'Denver Nuggets': 'DEN', 'Detroit Pistons': 'DET',
+    'Golden State Warriors': 'GSW', 'Houston Rockets': 'HOU', 'Indiana Pacers': 'IND',
+    'Los Angeles Clippers': 'LAC', 'Los Angeles Lakers': 'LAL', 'Memphis Grizzlies': 'MEM',
+    'Miami Heat': 'MIA', 'Milwaukee Bucks': 'MIL', 'Minnesota Timberwolves': 'MIN',
+    'New Orleans Pelicans': 'NOP', 'New York Knicks': 'NYK', 'Oklahoma City Thunder': 'OKC',
+    'Orlando Magic': 'ORL', 'Philadelphia 76ers': 'PHI', 'Phoenix Suns': 'PHO',
+    'Portland Trail Blazers': 'POR', 'Sacramento Kings': 'SAC', 'San Antonio Spurs': 'SAS',
+    'Toronto Raptors': 'TOR', 'Utah Jazz': 'UTA', 'Washington Wizards': 'WAS'
+}
+
+PER_GAME_COLUMNS = ["Player", "Age", "Team", "G", "MP", "PTS", "FG%", "3P%", "FT%"]
+PER_GAME_RENAME = {"G": "Games Played", "MP": "Minutes Played"}
+
+ADVANCED_COLUMNS = ["Player", "Team", "G", "PER", "TS%", "3PAr", "TRB%", "AST%", "STL%", "BLK%",
+                    "TOV%", "USG%", "WS", "BPM", "VORP"]
+ADVANCED_RENAME = {"G": "Games Played",
+                   "PER": "Offensive Production per Minute",
+                   "TS%": "True Shooting",
+                   "AST%": "Field Goals Assisted",
+                   "STL%": "Possessions end by steal",
+                   "BLK%": "Two-point attempts blocked",
+                   "TOV%": "Turnovers per 100 plays",
+                   "USG%": "Plays Used",
+                   "WS": "Win Shares",
+                   "BPM": "Box Plus/Minus",
+                   "VORP": "Value Over Replacement"}
+
+# NaN in these columns means "0 attempts"
+PERCENTAGE_COLS = ['FG%', '3P%', 'FT%', 'True Shooting', 'Turnovers per 100 plays']
+
+
+#SALARIES
+def clean_salaries(df_salaries):
+    df_salaries = df_salaries[["Player", "2025-26"]].rename(columns={"2025-26": "Salary"})
+    #Cleaning the column "Salary": String to int
+    df_salaries["Salary"] = df_salaries["Salary"].astype(str).str.replace(r'[$,]', '', regex=True)
+    df_salaries["Salary"] = pd.to_numeric(df_salaries["Salary"], errors='coerce')
+    df_salaries = df_salaries.dropna(subset=["Player", "Salary"])
+    # Duplicated players: keep the highest salary
+    df_salaries = df_salaries.sort_values('Salary', ascending=False)
+    return df_salaries.drop_duplicates(subset=['Player'], keep='first')
+
+
+#EXPANDED STANDINGS
+def clean_standings(df_expanded_standings):
+    df = df_expanded_standings[["Team", "Overall"]].copy()
+    df['Team_Code'] = df['Team'].map(TEAM_MAP)
+    unmapped = df[df['Team_Code'].isna()]['Team'].unique()
+    if len(unmapped):
+        print("Unmapped teams:", unmapped)
+    #"50-32" -> Wins, Losses -> Win_Pct (0.610)
+    df[['Wins', 'Losses']] = df['Overall'].str.split('-', expand=True)
+    df['Wins'] = pd.to_numeric(df['Wins'])
+    df['Losses'] = pd.to_numeric(df['Losses'])
+    df['Win_Pct'] = (df['Wins'] / (df['Wins'] + df['Losses'])).round(3)
+    return df
+
+
+#STATS PER GAME AND ADVANCED STATS
+def clean_per_game(df_stats_per_game, season=None):
+    #Game logs aggregated over several seasons (aggregate.py) have one row per player-season:
+    #keep the season of the advanced stats table (the one the salaries and standings are for)
+    if "Season" in df_stats_per_game.columns:
+        season = season or table_season(ADVANCED_STATS_FILE)
+        df_stats_per_game = df_stats_per_game[df_stats_per_game["Season"] == season]
+        if df_stats_per_game.empty:
+            raise ValueError(f"No {season} season rows in the per-game stats")
+    columns = PER_GAME_COLUMNS + [c for c in ["Season"] if c in df_stats_per_game.columns]
+    df = df_stats_per_game[columns].rename(columns=PER_GAME_RENAME)
+    #Players traded mid-season have one row per team plus a total row ('2TM', '3TM'...):
+    #keep the total row (full-season stats) with the team where he played the most games
+    df = resolve_multi_team(df, keys=["Player"])
+    return df.drop(columns=["Season"], errors="ignore")
+
+
+def clean_advanced(df_advanced_stats):
+    df = df_advanced_stats[ADVANCED_COLUMNS].rename(columns=ADVANCED_RENAME)
+    return resolve_multi_team(df, keys=["Player"])
+
+
+def merge_stats(df_stats_per_game_clean, df_advanced_stats_clean):
+    #Names are matched exactly, then normalized (accents, suffixes, punctuation), then fuzzy
+    df_stats_merged = merge_on_player(df_stats_per_game_clean, df_advanced_stats_clean,
+                                      how="inner", label="per game + advanced")
+    df_stats_merged = df_stats_merged.drop(columns=["Team_y", "Games Played_y"])
+    df_stats_merged = df_stats_merged.rename(columns={"Team_x": "Team", "Games Played_x": "Games Played"})
+    # Drop the "Ghost" row (League Average: no Age)
+    df_stats_final = df_stats_merged.dropna(subset=['Age']).copy()
+    df_stats_final[PERCENTAGE_COLS] = df_stats_final[PERCENTAGE_COLS].fillna(0.0)
+    return df_stats_final
+
+
+def build_dataset(stats_per_game_file=STATS_PER_GAME_FILE, verbose=False):
+    # Returns (stats_final, final dataset)
+    df_stats_per_game = pd.read_csv(stats_per_game_file)
+    df_advanced_stats = pd.read_csv(ADVANCED_STATS_FILE)
+    df_expanded_standings = pd.read_csv(STANDINGS_FILE, header=1)  #Header in row 2
+    df_salaries = pd.read_csv(SALARIES_FILE)
+
+    df_salaries = clean_salaries(df_salaries)
+    df_standings = clean_standings(df_expanded_standings)
+    df_stats_final = merge_stats(clean_per_game(df_stats_per_game), clean_advanced(df_advanced_stats))
+    if verbose:
+        df_stats_final.info()
+
+    #MERGE STATS AND SALARIES
+    df_stats_salaries = merge_on_player(df_stats_final, df_salaries, how="inner", label="stats + salaries")
+
+    #MERGE WITH STANDINGS
+    df_final = pd.merge(
+        left=df_stats_salaries,
+        right=df_standings[["Team_Code", "Win_Pct"]],
+        left_on="Team",
+        right_on="Team_Code",
+        how="left"
+    )
+    df_final = df_final.drop(columns=["Team_Code"])
+    print("Players without Win_Pct (team not in standings):", df_final["Win_Pct"].isna().sum())
+    if verbose:
+        df_final.info()
+    return df_stats_final, df_final
+
+
+def run(stats_per_game_file=STATS_PER_GAME_FILE, verbose=False):
+    df_stats_final, df_final = build_dataset(stats_per_game_file, verbose=verbose)
+    save_artifact(df_stats_final, "stats_final")
+    #Final save (data/final_nba_dataset.parquet)
+    save_artifact(df_final, "final_nba_dataset")
+    print(f"Final dataset: {len(df_final)} players saved to 'data/final_nba_dataset.parquet'")
+    return df_final
@@ -0,0 +1,230 @@
+import argparse
+import sys
+import time
+
+# Single entry point for the whole project:
+#   python cli.py scrape --seasons 2016-2025     python cli.py clean
+#   python cli.py cluster                        python cli.py plots
+#   python cli.py assign new_players.csv         (archetypes from the saved model, no refit)
+#   python cli.py train --n-iter 50              python cli.py predict "Nikola Jokic"
+#   python cli.py score                          (reports from the saved model, no retrain)
+#   python cli.py importance                     (permutation importance, cached per model)
+#   python cli.py similar "Jalen Brunson" --k 10  (nearest players in the archetype space)
+#   python cli.py scenarios --delta PTS=0:3:1    (what-if salaries for every player)
+#   python cli.py pipeline                       (incremental run of every stage)
+# Each subcommand imports only what it needs: `predict` never loads scikit-learn or matplotlib.
+
+# Subcommands that forward their arguments to the module's own argparse
+PASS_THROUGH = {
+    "scrape": ("scrape", "Scrape Basketball-Reference tables (scrape.py)."),
+    "gamelogs": ("gamelogs", "Crawl player game logs (gamelogs.py)."),
+    "aggregate": ("aggregate", "Aggregate game logs into player-seasons (aggregate.py)."),
+    "cluster-stream": ("streaming_clustering", "Mini-batch archetype clustering in chunks (streaming_clustering.py)."),
+    "serve": ("scoring_service", "Local micro-batching scoring service (scoring_service.py)."),
+    "update-gaps": ("incremental_gaps", "Apply a delta of player changes to the value gaps (incremental_gaps.py)."),
+    "similar": ("comparables", "Most similar players and their salaries (comparables.py)."),
+    "scenarios": ("scenarios", "What-if salary scenarios over a grid of stat deltas (scenarios.py)."),
+    "pipeline": ("pipeline", "Run the stages that changed (pipeline.py)."),
+}
+
+
+def cmd_clean(args):
+    from cleaning import STATS_PER_GAME_FILE, run
+
+    run(args.stats_per_game or STATS_PER_GAME_FILE, verbose=args.verbose)
+
+
+def cmd_cluster(args):
+    from clustering import run
+
+    run(auto_k=args.auto_k, workers=args.workers, warm_start=not args.cold_start, refit=args.refit)
+
+
+def cmd_assign(args):
+    import pandas as pd
+
+    from artifacts import load_artifact
+    from clustering import assign_archetype, load_archetype_model
+
+    model = load_archetype_model(args.version)
+    if args.input is None:
+        df = load_artifact("final_nba_dataset")
+    elif args.input.endswith(".parquet"):
+        df = pd.read_parquet(args.input)
+    else:
+        df = pd.read_csv(args.input)
+    df[["Archetype_ID", "Player_Archetype"]] = assign_archetype(df, model)
+    if args.output:
+        df.to_csv(args.output, index=False)
+        print(f"{len(df)} players labeled with archetype model v{model['version']:03d} -> '{args.output}'")
+    else:
+        print(df[["Player", "Player_Archetype"]].to_markdown(index=False))
+
+
+def cmd_plots(args):
+    from plots import render_cluster_plots
+
+    render_cluster_plots()
+
+
+def cmd_train(args):
+    from salary_model import benchmark_search, compare_engines, run
+
+    if args.benchmark == "engines":
+        compare_engines(n_iter=args.n_iter, cv=args.cv)
+    elif args.benchmark:
+        benchmark_search(n_iter=args.n_iter, cv=args.cv, benchmark=args.benchmark)
+    else:
+        run(n_iter=args.n_iter, cv=args.cv, cache=not args.no_cache, scale=not args.no_scale,
+            method=args.search, resource=args.resource, engine=args.engine, in_sample=args.in_sample,
+            significant_only=args.significant_only, importance=args.importance)
+
+
+def cmd_score(args):
+    from salary_model import score
+
+    score(args.version, significant_only=args.significant_only)
+
+
+def cmd_models(args):
+    from model_registry import list_models
+
+    models = list_models()
+    print(models.to_markdown(index=False, floatfmt=".4f") if len(models) else "No registered models")
+
+
+def cmd_bench_inference(args):
+    from artifacts import load_artifact
+    from fast_forest import CompiledForest, benchmark
+    from model_registry import load_model
+    from salary_model import FEATURES
+
+    df = load_artifact("nba_data_with_archetypes", columns=FEATURES)
+    benchmark(load_model(args.version), CompiledForest.from_registry(args.version), df)
+
+
+def cmd_importance(args):
+    from importance import run
+
+    run(args.version, n_repeats=args.n_repeats, max_samples=args.max_samples, workers=args.workers,
+        refresh=args.refresh)
+
+
+def sample_size(value):
+    # Row count (e.g. 50) or fraction of the test set (e.g. 0.5)
+    value = float(value)
+    return int(value) if value > 1 else value
+
+
+def cmd_predict(args):
+    from salary_model import REPORT_COLUMNS, REPORT_FLOATFMT, lookup_predictions
+
+    predictions = lookup_predictions(args.players)
+    if len(predictions):
+        print(predictions[REPORT_COLUMNS].to_markdown(index=False, floatfmt=REPORT_FLOATFMT[1:]))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="NBA salary market pipeline.")
+    parser.add_argument("--time", action="store_true", help="Print the wall time of the command.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, (_, help_text) in PASS_THROUGH.items():
+        p = sub.add_parser(name, help=help_text, add_help=False)
+        p.add_argument("args", nargs=argparse.REMAINDER)
+
+    p = sub.add_parser("clean", help="Clean and merge the scraped tables (main.py).")
+    p.add_argument("stats_per_game", nargs="?", default=None,
+                   help="Per-game stats CSV (default: the scraped table; or aggregate.py's output).")
+    p.add_argument("--verbose", action="store_true", help="Print df.info() of the intermediate tables.")
+    p.set_defaults(func=cmd_clean)
+
+    p = sub.add_parser("cluster", help="Fit the player archetypes (k-means.py).")
+    p.add_argument("--auto-k", action="store_true",
+                   help="Use the K with the best silhouette instead of the named K=8 archetypes.")
+    p.add_argument("--workers", type=int, default=None, help="Processes for the elbow sweep (default: all cores).")
+    p.add_argument("--cold-start", action="store_true",
+                   help="Fit every K from scratch (n_init=10) instead of warm-starting from K-1.")
+    p.add_argument("--refit", action="store_true",
+                   help="Fresh fit of the archetypes instead of starting from the saved model's centroids.")
+    p.set_defaults(func=cmd_cluster)
+
+    p = sub.add_parser("assign", help="Label players with the saved archetype model (no refit).")
+    p.add_argument("input", nargs="?", default=None,
+                   help="CSV/Parquet with the clustering features (default: the final dataset).")
+    p.add_argument("--version", type=int, default=None, help="Model version (default: latest).")
+    p.add_argument("--output", default=None, help="CSV with the labeled rows (default: print them).")
+    p.set_defaults(func=cmd_assign)
+
+    p = sub.add_parser("plots", help="Render the clustering figures.")
+    p.set_defaults(func=cmd_plots)
+
+    p = sub.add_parser("train", help="Train the salary model and build the value-gap reports (randomforest.py).")
+    p.add_argument("--n-iter", type=int, default=50)
+    p.add_argument("--cv", type=int, default=5)
+    p.add_argument("--no-cache", action="store_true", help="Refit the preprocessing for every candidate.")
+    p.add_argument("--no-scale", action="store_true", help="Skip the StandardScaler (no effect on trees).")
+    p.add_argument("--search", choices=["random", "halving"], default="random",
+                   help="halving: successive halving, weak candidates are dropped after a few trees.")
+    p.add_argument("--resource", default=None,
+                   help="Resource of the halving search (default: the engine's trees; or n_samples).")
+    p.add_argument("--engine", choices=["forest", "hgb", "linear"], default="forest",
+                   help="Regressor: random forest, histogram gradient boosting or ridge.")
+    p.add_argument("--in-sample", action="store_true",
+                   help="Value gaps from the final model for every player (instead of out-of-fold).")
+    p.add_argument("--significant-only", action="store_true",
+                   help="Top-20 lists without the players whose salary is inside their prediction interval.")
+    p.add_argument("--importance", action="store_true",
+                   help="Also compute the permutation importance of the new model (else: `cli.py importance`).")
+    p.add_argument("--benchmark", choices=["cache", "search", "engines"], default=None,
+                   help="Only time the search (cache/scaler, random vs halving) or compare the engines.")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("score", help="Value-gap reports from a registered model (no retrain).")
+    p.add_argument("--version", type=int, default=None, help="Model version (default: latest).")
+    p.add_argument("--significant-only", action="store_true",
+                   help="Top-20 lists without the players whose salary is inside their prediction interval.")
+    p.set_defaults(func=cmd_score)
+
+    p = sub.add_parser("models", help="List the registered salary models.")
+    p.set_defaults(func=cmd_models)
+
+    p = sub.add_parser("bench-inference", help="Latency of the sklearn pipeline vs the compiled forest.")
+    p.add_argument("--version", type=int, default=None, help="Model version (default: latest).")
+    p.set_defaults(func=cmd_bench_inference)
+
+    p = sub.add_parser("importance", help="Permutation importance (cached) and features_importance.png.")
+    p.add_argument("--version", type=int, default=None, help="Model version (default: latest).")
+    p.add_argument("--n-repeats", type=int, default=10)
+    p.add_argument("--max-samples", type=sample_size, default=None,
+                   help="Test rows per repeat: a count or a fraction (default: all).")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    p.add_argument("--refresh", action="store_true", help="Ignore the cache and permute again.")
+    p.set_defaults(func=cmd_importance)
+
+    p = sub.add_parser("predict", help="Salary, predicted salary and value gap of some players.")
+    p.add_argument("players", nargs="+")
+    p.set_defaults(func=cmd_predict)
+    return parser
+
+
+def main(argv=None):
+    start = time.perf_counter()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    # Pass-through commands get their arguments untouched (argparse would reorder
+    # option values such as `--port 0`)
+    command_at = next((i for i, arg in enumerate(argv) if not arg.startswith("-")), None)
+    if command_at is not None and argv[command_at] in PASS_THROUGH:
+        args = parser.parse_args(argv[:command_at + 1])
+        module = __import__(PASS_THROUGH[args.command][0])
+        module.main(argv[command_at + 1:])
+    else:
+        args = parser.parse_args(argv)
+        args.func(args)
+    if args.time:
+        print(f"[{args.command}] {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
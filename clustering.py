@@ -0,0 +1,312 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from artifacts import load_artifact, save_artifact
+
+# K - MEANS CLUSTERING -> PLAYER ARCHETYPE
+# scikit-learn is imported inside the functions that need it, so importing this module
+# (e.g. for CLUSTERING_FEATURES) stays cheap.
+
+CLUSTERING_FEATURES = [
+    "Games Played",
+    "Minutes Played",
+    "Age",
+    "PTS",
+    'FG%',
+    '3P%',
+    'FT%',
+    'Offensive Production per Minute',
+    'True Shooting',
+    '3PAr',
+    'TRB%',
+    'Field Goals Assisted',
+    'Possessions end by steal',
+    'Two-point attempts blocked',
+    'Turnovers per 100 plays',
+    'Plays Used',
+    'Win Shares',
+    'Box Plus/Minus',
+    'Value Over Replacement',
+    'Win_Pct'
+]
+
+# We use the original stats for profiling
+PROFILE_COLS = [
+    "Minutes Played",
+    'Offensive Production per Minute',
+    'Field Goals Assisted',  # AST%
+    'TRB%',
+    "3PAr",
+    "3P%",
+    'True Shooting',
+    'Two-point attempts blocked',
+    "Possessions end by steal",
+    'Plays Used',  # USG%
+    'Win Shares',
+    "Value Over Replacement"
+]
+
+K_VALUES = range(3, 15)
+OPTIMAL_K = 8
+# Rows used for the silhouette / Calinski-Harabasz scores of each k (stratified by cluster)
+SCORE_SAMPLE_SIZE = 2000
+
+# Fitted scaler + centroids + names, one JSON file per version (latest.json = newest)
+ARCHETYPE_MODEL_DIR = Path("data") / "archetype_model"
+
+# Names based on the calculated profiles (derived from the profile table).
+# They belong to the ids of the first saved fit; later fits inherit them through the
+# closest centroid of the previous model (see build_archetype_model).
+ARCHETYPE_NAMES = {
+    0: "Elite Creator / Franchise Star",
+    1: "Low Efficiency Creator",
+    2: "Low Impact / End of Bench",
+    3: "High Volume Inefficient Scorer",
+    4: "Defensive Anchor / Elite Rebounder",
+    5: "3&D Specialist",
+    6: "Versatile Player",
+    7: "High - Impact Starter / Primary Option"
+}
+
+
+def load_clustering_data():
+    # Only the columns used for the clustering are read from the artifact
+    df = load_artifact("final_nba_dataset", columns=["Player", "Salary"] + CLUSTERING_FEATURES)
+    df["Salary_log"] = np.log(df["Salary"] + 1)
+    print(f"Salary - Mean: {df['Salary'].mean():.2f} - Median: {df['Salary'].median():.2f} - "
+          f"Standar Deviaton: {df['Salary'].std():.2f}")
+    print(f"Salary log - Mean: {df['Salary_log'].mean():.2f} - Median: {df['Salary_log'].median():.2f}")
+    return df
+
+
+def scale_features(df):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    return scaler, scaler.fit_transform(df[CLUSTERING_FEATURES])
+
+
+def stratified_sample(labels, sample_size, seed=42):
+    # Indices of a sample with the same cluster proportions as `labels` (at least 2 rows
+    # per cluster, so that small archetypes still count in the silhouette)
+    labels = np.asarray(labels)
+    if sample_size is None or sample_size >= len(labels):
+        return np.arange(len(labels))
+    rng = np.random.default_rng(seed)
+    idx = []
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        n = max(2, round(sample_size * len(members) / len(labels)))
+        idx.append(rng.choice(members, size=min(n, len(members)), replace=False))
+    return np.sort(np.concatenate(idx))
+
+
+def _warm_inits(X_scaled, kmeans, n_candidates=3, seed=42):
+    # Starting centroids for k+1 from a fit with k clusters: (a) the cluster with the largest
+    # WCSS split in two along its main axis, (b) the old centroids plus one row drawn with
+    # probability ~ distance^2 (k-means++ step). Each one needs a single k-means run.
+    centers, labels = kmeans.cluster_centers_, kmeans.labels_
+    sse = np.array([((X_scaled[labels == j] - centers[j]) ** 2).sum() for j in range(len(centers))])
+    j = sse.argmax()
+    members = X_scaled[labels == j] - centers[j]
+    axis = np.linalg.svd(members, full_matrices=False)[2][0]
+    step = np.sqrt((members @ axis).var()) * axis
+    inits = [np.vstack([np.delete(centers, j, axis=0), centers[j] + step, centers[j] - step])]
+
+    rng = np.random.default_rng(seed + len(centers))
+    dist = ((X_scaled[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    for i in rng.choice(len(X_scaled), size=n_candidates, replace=False, p=dist / dist.sum()):
+        inits.append(np.vstack([centers, X_scaled[i]]))
+    return inits
+
+
+def _sweep_chain(X_scaled, k_values, warm_start, sample_size):
+    # One worker: fits a run of consecutive k. Only the first one is a full n_init=10 fit,
+    # the next ones start from the previous k (4 single k-means runs instead of 10).
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import calinski_harabasz_score, silhouette_score
+
+    rows, kmeans = [], None
+    for k in k_values:
+        if warm_start and kmeans is not None and kmeans.n_clusters == k - 1:
+            kmeans = min((KMeans(n_clusters=k, init=init, n_init=1, random_state=42).fit(X_scaled)
+                          for init in _warm_inits(X_scaled, kmeans)), key=lambda m: m.inertia_)
+        else:
+            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(X_scaled)
+        idx = stratified_sample(kmeans.labels_, sample_size)
+        rows.append({"k": k,
+                     "wcss": kmeans.inertia_,
+                     "silhouette": silhouette_score(X_scaled[idx], kmeans.labels_[idx]),
+                     "calinski_harabasz": calinski_harabasz_score(X_scaled[idx], kmeans.labels_[idx])})
+    return rows
+
+
+def elbow_sweep(X_scaled, k_values=K_VALUES, workers=None, warm_start=True, sample_size=SCORE_SAMPLE_SIZE):
+    # The k values are split in `workers` runs of consecutive k, fitted in parallel processes
+    # (warm-started inside each run). workers=1 and warm_start=False is the original sweep.
+    from concurrent.futures import ProcessPoolExecutor
+
+    k_values = list(k_values)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(k_values)))
+    chains = [chunk.tolist() for chunk in np.array_split(k_values, workers)]
+    if workers == 1:
+        rows = _sweep_chain(X_scaled, chains[0], warm_start, sample_size)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_sweep_chain, X_scaled, chain, warm_start, sample_size) for chain in chains]
+            rows = [row for future in futures for row in future.result()]
+    return pd.DataFrame(rows)
+
+
+def suggest_k(sweep):
+    # Best silhouette; Calinski-Harabasz breaks ties
+    best = sweep.sort_values(["silhouette", "calinski_harabasz"], ascending=False)
+    return int(best["k"].iloc[0])
+
+
+def fit_archetypes(X_scaled, k=OPTIMAL_K, init=None):
+    # init: starting centroids (e.g. the saved model's), one run from there instead of 10
+    from sklearn.cluster import KMeans
+
+    if init is not None:
+        return KMeans(n_clusters=k, init=init, n_init=1, random_state=42).fit(X_scaled)
+    kmeans_final = KMeans(n_clusters=k, random_state=42, n_init=10)
+    kmeans_final.fit(X_scaled)
+    return kmeans_final
+
+
+#-- PERSISTED ARCHETYPE MODEL --
+def _match_centroids(centers, previous_centers):
+    # Pairs (new row, previous row) with the smallest total squared distance
+    from scipy.optimize import linear_sum_assignment
+
+    cost = ((centers[:, None, :] - previous_centers[None, :, :]) ** 2).sum(axis=2)
+    return list(zip(*linear_sum_assignment(cost)))
+
+
+def scaled_centroids(model, scaler):
+    # Centroids of a saved model in the space of another scaler
+    return (np.asarray(model["centroids"]) * model["scale"] + model["mean"] - scaler.mean_) / scaler.scale_
+
+
+def build_archetype_model(scaler, kmeans, previous=None):
+    # Everything needed to label players without refitting. With a previous model, each new
+    # centroid takes the id and name of the closest previous one (compared in the new
+    # scaled space), so a refit on new data does not scramble the archetypes.
+    centers = kmeans.cluster_centers_
+    k = len(centers)
+    order = list(range(k))
+    if previous is None:
+        names = ARCHETYPE_NAMES if k == OPTIMAL_K else {}
+        names = [names.get(i, f"Archetype {i}") for i in range(k)]
+    else:
+        pairs = _match_centroids(centers, scaled_centroids(previous, scaler))
+        if k == previous["k"]:
+            # Same K: keep the previous ids too
+            for row, previous_row in pairs:
+                order[previous_row] = row
+            names = list(previous["names"])
+        else:
+            # Matched centroids keep their previous name; the others get new generic names
+            # (KMeans ids are arbitrary, so the hand-written id -> name map does not apply)
+            names = [None] * k
+            for row, previous_row in pairs:
+                names[row] = previous["names"][previous_row]
+            fresh = (f"Archetype {i}" for i in range(k + previous["k"])
+                     if f"Archetype {i}" not in previous["names"])
+            names = [name if name is not None else next(fresh) for name in names]
+
+    model = {
+        "k": k,
+        "features": list(CLUSTERING_FEATURES),
+        "mean": scaler.mean_.tolist(),
+        "scale": scaler.scale_.tolist(),
+        "centroids": centers[order].tolist(),
+        "names": names,
+    }
+    model["fingerprint"] = hashlib.sha256(json.dumps(model, sort_keys=True).encode()).hexdigest()
+    return model
+
+
+def save_archetype_model(model, model_dir=ARCHETYPE_MODEL_DIR):
+    # New version only if something changed (same data + same fit = same version)
+    model_dir = Path(model_dir)
+    latest = load_archetype_model(model_dir=model_dir) if (model_dir / "latest.json").exists() else None
+    if latest is not None and latest["fingerprint"] == model["fingerprint"]:
+        return latest
+    versions = [int(p.stem[1:]) for p in model_dir.glob("v*.json")]
+    model = dict(model, version=max(versions, default=0) + 1,
+                 created=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    model_dir.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(model, indent=1)
+    (model_dir / f"v{model['version']:03d}.json").write_text(text)
+    (model_dir / "latest.json").write_text(text)
+    return model
+
+
+def load_archetype_model(version=None, model_dir=ARCHETYPE_MODEL_DIR):
+    path = Path(model_dir) / ("latest.json" if version is None else f"v{int(version):03d}.json")
+    if not path.exists():
+        raise FileNotFoundError(f"Archetype model not found: {path} (run `python cli.py cluster`)")
+    return json.loads(path.read_text())
+
+
+def assign_archetype(df, model=None):
+    # Predict-only path: scale with the saved statistics and take the nearest centroid
+    # (one matrix product for the whole frame, no scikit-learn, no refit).
+    # Rows with a missing feature get no archetype (<NA> / None) rather than a wrong one.
+    model = model or load_archetype_model()
+    X = (df[model["features"]].to_numpy(dtype=float) - model["mean"]) / model["scale"]
+    complete = ~np.isnan(X).any(axis=1)
+    centroids = np.asarray(model["centroids"])
+    dist = (X ** 2).sum(axis=1)[:, None] - 2 * X @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+    ids = dist.argmin(axis=1)
+    labels = pd.DataFrame({"Archetype_ID": pd.array(ids, dtype="Int64"),
+                           "Player_Archetype": np.asarray(model["names"], dtype=object)[ids]}, index=df.index)
+    labels.loc[~complete] = [pd.NA, None]
+    return labels
+
+
+def cluster_profile(df):
+    return (df.groupby('Archetype_ID')[PROFILE_COLS].mean()
+            .sort_values(by='Value Over Replacement', ascending=False))
+
+
+def run(auto_k=False, workers=None, warm_start=True, refit=False):
+    df = load_clustering_data()
+    scaler, X_scaled = scale_features(df)
+
+    #Find optimal K (saved for the Elbow Plot, see plots.py)
+    sweep = elbow_sweep(X_scaled, workers=workers, warm_start=warm_start)
+    print(sweep.to_markdown(index=False, floatfmt=(".0f", ".3f", ".3f", ".3f")))
+    save_artifact(sweep, "elbow_sweep")
+    k = suggest_k(sweep) if auto_k else OPTIMAL_K
+    print(f"Suggested K (silhouette): {suggest_k(sweep)} - using K={k}")
+
+    #Fit the final model, save it and assign the cluster labels.
+    # With a saved model of the same K the fit starts from its centroids, so new data moves
+    # the archetypes a little instead of reshuffling them (refit=True: fresh n_init=10 fit).
+    previous = load_archetype_model() if (ARCHETYPE_MODEL_DIR / "latest.json").exists() else None
+    init = None
+    if previous is not None and previous["k"] == k and not refit:
+        init = scaled_centroids(previous, scaler)
+    kmeans_final = fit_archetypes(X_scaled, k, init=init)
+    model = save_archetype_model(build_archetype_model(scaler, kmeans_final, previous))
+    print(f"Archetype model v{model['version']:03d} ({model['fingerprint'][:12]})")
+    df[['Archetype_ID', 'Player_Archetype']] = assign_archetype(df, model)
+    print("\n--- Cluster Profile (Averaged Stats) ---")
+    print(cluster_profile(df).to_markdown(floatfmt=".3f"))
+
+    # Save the full dataset (all columns) with the new Archetype feature
+    df_full = load_artifact("final_nba_dataset")
+    for col in ["Salary_log", "Archetype_ID", "Player_Archetype"]:
+        df_full[col] = df[col]
+    save_artifact(df_full, "nba_data_with_archetypes")
+    print(f"\nFinal dataset saved to 'data/nba_data_with_archetypes.parquet' with Archetype feature.")
+    return df_full
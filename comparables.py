@@ -0,0 +1,133 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifacts import load_artifact
+from clustering import load_archetype_model
+
+
+# "Comparable players": the k nearest player-seasons in the standardized clustering space,
+# with what they are paid. The rows are scaled with the saved archetype model (the same
+# StandardScaler statistics as k-means.py), so distances mean the same as for the archetypes.
+# The index is a KD-tree (scipy) over all the players plus a small buffer of player-seasons
+# inserted since it was built: queries search both and merge the results, and the tree is
+# rebuilt once the buffer reaches REBUILD_THRESHOLD rows (inserts only append in between).
+
+DEFAULT_K = 10
+REBUILD_THRESHOLD = 256
+# Shown with every neighbour (the value-gap columns only once the salary model has run)
+COMPARABLE_COLUMNS = ["Player", "Player_Archetype", "Salary", "Predicted_Salary", "Value_Gap"]
+
+
+class ComparablesIndex:
+    def __init__(self, players, model=None):
+        self.model = model or load_archetype_model()
+        self.features = self.model["features"]
+        self.mean = np.asarray(self.model["mean"])
+        self.scale = np.asarray(self.model["scale"])
+        # Plain arrays per column: a result table is a few takes, not a DataFrame slice
+        self.columns = {c: players[c].to_numpy() for c in COMPARABLE_COLUMNS if c in players.columns}
+        self.positions = {}
+        self._index_names(0)
+        self.points = self._scale(players)
+        self._build()
+
+    def _scale(self, df):
+        return (df[self.features].to_numpy(dtype=float) - self.mean) / self.scale
+
+    def _index_names(self, start):
+        # Player -> position of their latest season
+        for position, player in enumerate(self.columns["Player"][start:], start):
+            self.positions[player] = position
+
+    def _build(self):
+        from scipy.spatial import cKDTree
+
+        self.tree = cKDTree(self.points)
+        self.n_indexed = len(self.points)
+
+    def insert(self, rows):
+        # New player-seasons (clustering features + Player, Salary...): searched brute force
+        # until the next rebuild
+        start = len(self.points)
+        for column, values in self.columns.items():
+            new = rows[column].to_numpy() if column in rows.columns else np.full(len(rows), np.nan)
+            self.columns[column] = np.concatenate([values, new])
+        self._index_names(start)
+        self.points = np.vstack([self.points, self._scale(rows)])
+        if len(self.points) - self.n_indexed >= REBUILD_THRESHOLD:
+            self._build()
+
+    def search(self, X, k=DEFAULT_K):
+        # (distances, positions) of the k nearest points of each scaled row, closest first
+        X = np.atleast_2d(X)
+        dist, pos = self.tree.query(X, k=min(k, self.n_indexed))
+        dist, pos = dist.reshape(len(X), -1), pos.reshape(len(X), -1)
+        buffer = self.points[self.n_indexed:]
+        if len(buffer):
+            buffer_dist = np.sqrt(((X[:, None, :] - buffer[None, :, :]) ** 2).sum(axis=2))
+            buffer_pos = np.broadcast_to(np.arange(self.n_indexed, len(self.points)), buffer_dist.shape)
+            dist, pos = np.hstack([dist, buffer_dist]), np.hstack([pos, buffer_pos])
+            order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+            dist, pos = np.take_along_axis(dist, order, axis=1), np.take_along_axis(pos, order, axis=1)
+        return dist, pos
+
+    def _table(self, dist, pos):
+        return pd.DataFrame(dict({c: values[pos] for c, values in self.columns.items()}, Distance=dist))
+
+    def query(self, rows, k=DEFAULT_K):
+        # Comparables of players that may not be in the index (e.g. a prospect's stats):
+        # one table per row, in the order of rows
+        dist, pos = self.search(self._scale(rows), k)
+        return [self._table(d, p) for d, p in zip(dist, pos)]
+
+    def similar(self, player, k=DEFAULT_K):
+        # The k players most similar to an indexed player (the player is left out)
+        if player not in self.positions:
+            raise KeyError(f"{player} is not in the index")
+        position = self.positions[player]
+        dist, pos = self.search(self.points[position], k + 1)
+        keep = pos[0] != position
+        return self._table(dist[0][keep][:k], pos[0][keep][:k])
+
+
+def load_players():
+    # Scored players (with the value gaps) when the salary model has run
+    try:
+        return load_artifact("dataset_visualizations")
+    except FileNotFoundError:
+        return load_artifact("nba_data_with_archetypes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Most statistically similar players and what they are paid.")
+    parser.add_argument("players", nargs="+", help="Player names (spelling differences are tolerated).")
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--add", default=None,
+                        help="CSV with new player-seasons (clustering features + Player, Salary) to insert first.")
+    parser.add_argument("--version", type=int, default=None, help="Archetype model version (default: latest).")
+    args = parser.parse_args(argv)
+
+    from names import NameIndex
+
+    index = ComparablesIndex(load_players(), load_archetype_model(args.version))
+    if args.add:
+        index.insert(pd.read_csv(args.add))
+    matches = NameIndex(index.columns["Player"]).resolve(args.players)
+    floatfmt = [None if c in ("Player", "Player_Archetype") else ",.0f" for c in index.columns] + [".2f"]
+    for name in args.players:
+        player = matches.get(name, (None,))[0]
+        if player is None:
+            print(f"\nNot found: {name}")
+            continue
+        start = time.perf_counter()
+        table = index.similar(player, args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n--- {args.k} players most similar to {player} ({elapsed:.2f} ms) ---")
+        print(table.to_markdown(index=False, floatfmt=floatfmt))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import pandas as pd
+
+
+# Multi-team collapse shared by the per-game and advanced stats tables.
+# A player traded mid-season has one row per team plus a total row ('2TM', '3TM'...).
+# We keep the total row (full-season stats) and give it the team where the player
+# played the most games, so it can be joined with that team's Win_Pct.
+
+TOTAL_TAGS = ['2TM', '3TM', '4TM', '5TM', 'TOT']
+
+
+def resolve_multi_team(df, keys=("Player",), team_col="Team", games_col="Games Played"):
+    # One vectorized pass, keyed by `keys` (plus Season when the table has several seasons):
+    # - main team = the individual team row with the most games (idxmax, first one wins ties)
+    # - kept row  = the first total row of the key, or its first row when there is no total
+    keys = list(keys)
+    if "Season" in df.columns and "Season" not in keys:
+        keys.append("Season")
+    # Work on positions so duplicated index labels (e.g. concatenated seasons) are harmless
+    frame = df[keys + [team_col, games_col]].reset_index(drop=True)
+    is_total = frame[team_col].isin(TOTAL_TAGS).to_numpy()
+    key_index = pd.MultiIndex.from_frame(frame[keys])
+
+    individual = frame[~is_total & frame[games_col].notna().to_numpy()]
+    main_rows = individual.groupby(keys, sort=False, dropna=False)[games_col].idxmax().to_numpy()
+    main_team = pd.Series(frame[team_col].to_numpy()[main_rows], index=key_index[main_rows])
+
+    has_total = key_index.isin(key_index[is_total])
+    first_total = is_total.copy()
+    first_total[is_total] = ~frame.loc[is_total, keys].duplicated().to_numpy()
+    keep = first_total | (~has_total & ~frame.duplicated(keys).to_numpy())
+
+    out = df[keep].copy()
+    totals = is_total[keep]
+    out.loc[totals, team_col] = main_team.reindex(key_index[keep][totals]).to_numpy()
+    # A total row without any individual team row: nothing to map it to
+    out[team_col] = out[team_col].fillna('Unknown')
+    return out
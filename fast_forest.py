@@ -0,0 +1,120 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from model_registry import load_meta, load_model, load_tree_arrays, pack_forest, preprocessing_params
+
+
+# Compiled inference for the salary forest: no ColumnTransformer, no loop over estimators.
+# The trees are the flat node arrays of model_registry.pack_forest (memory-mapped from the
+# registry), the preprocessing is a few NumPy operations on the raw feature columns, and a
+# whole batch walks every tree at once: one array with a node id per (row, tree), advanced
+# one level per step; walks that reach a leaf leave the active set.
+# Same arithmetic as sklearn (scaled values cast to float32 before comparing with the
+# float64 thresholds, NaN sent to the child sklearn learned for missing values), so
+# predictions match best_rf_model.predict to float precision.
+
+
+class CompiledForest:
+    def __init__(self, trees, preprocessing):
+        self.feature = np.asarray(trees["feature"])
+        self.threshold = np.asarray(trees["threshold"])
+        self.left = np.asarray(trees["left"])
+        self.right = np.asarray(trees["right"])
+        self.value = np.asarray(trees["value"])
+        self.roots = np.asarray(trees["roots"])
+        # None for registry versions packed before it was stored: NaN inputs are rejected
+        self.missing_left = np.asarray(trees["missing_left"]) if "missing_left" in trees else None
+        self.is_leaf = self.left == np.arange(len(self.left))
+        self.numeric = preprocessing["numeric"]
+        self.mean = None if preprocessing["mean"] is None else np.asarray(preprocessing["mean"])
+        self.scale = None if preprocessing["scale"] is None else np.asarray(preprocessing["scale"])
+        self.categorical = [(c["column"], pd.Index(c["categories"])) for c in preprocessing["categorical"]]
+
+    @classmethod
+    def from_pipeline(cls, model):
+        params = preprocessing_params(model)
+        if params is None or not hasattr(model.named_steps["regressor"], "estimators_"):
+            raise ValueError("Only forests with scaled / one-hot preprocessing can be compiled")
+        return cls(pack_forest(model.named_steps["regressor"]), params)
+
+    @classmethod
+    def from_registry(cls, version=None):
+        # Memory maps + meta.json: no joblib, no scikit-learn
+        meta = load_meta(version)
+        if not meta.get("preprocessing"):
+            raise ValueError(f"Model v{meta['version']:03d} cannot be compiled ({meta['engine']})")
+        return cls(load_tree_arrays(meta["version"]), meta["preprocessing"])
+
+    def transform(self, df):
+        # ColumnTransformer equivalent: scaled numeric columns + one-hot columns, as float32
+        X = df[self.numeric].to_numpy(dtype=np.float64)
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        parts = [X.astype(np.float32)]
+        for column, categories in self.categorical:
+            codes = categories.get_indexer(df[column])  # -1 (unknown) matches no column
+            parts.append((codes[:, None] == np.arange(len(categories))).astype(np.float32))
+        return np.hstack(parts)
+
+    def predict(self, df):
+        return self.predict_trees(df).mean(axis=1)
+
+    def predict_trees(self, df):
+        # (rows x trees) matrix with the prediction of every tree
+        X = self.transform(df)
+        has_nan = np.isnan(X).any()
+        if has_nan and self.missing_left is None:
+            raise ValueError("Missing values in the features: this model version has no missing-value "
+                             "routing (train it again, or use the sklearn pipeline)")
+        n_rows, n_cols = X.shape
+        n_trees = len(self.roots)
+        values = X.ravel()
+        # One walk per (row, tree), flattened: walk i is row i // n_trees on tree i % n_trees
+        node = np.tile(self.roots, n_rows)
+        row_start = np.repeat(np.arange(n_rows) * n_cols, n_trees)
+        active = np.arange(len(node))
+        while len(active):
+            current = node[active]
+            x = values.take(row_start[active] + self.feature.take(current))
+            go_left = x <= self.threshold.take(current)
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.missing_left.take(current), go_left)
+            current = np.where(go_left, self.left.take(current), self.right.take(current))
+            node[active] = current
+            # Walks that reached a leaf drop out of the next step
+            active = active[~self.is_leaf.take(current)]
+        return self.value.take(node).reshape(n_rows, n_trees)
+
+
+def load_predictor(version=None, compiled=True):
+    # (predictor, meta): the compiled forest when the registered model can be compiled, else
+    # the sklearn pipeline. Both have predict(); only the compiled forest has predict_trees()
+    meta = load_meta(version)
+    if compiled and meta.get("preprocessing"):
+        return CompiledForest.from_registry(meta["version"]), meta
+    return load_model(meta["version"]), meta
+
+
+def benchmark(model, compiled, df, repeats=50):
+    # Latency of one row and of the whole table, sklearn Pipeline vs compiled forest
+    def timed(func, data):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func(data)
+            timings.append(time.perf_counter() - start)
+        return np.median(timings) * 1000
+
+    one_row = df.iloc[:1]
+    rows = []
+    for name, func in [("sklearn Pipeline.predict", model.predict), ("CompiledForest.predict", compiled.predict)]:
+        rows.append({"path": name, "1_row_ms": timed(func, one_row),
+                     f"{len(df)}_rows_ms": timed(func, df)})
+    report = pd.DataFrame(rows)
+    difference = np.abs(model.predict(df) - compiled.predict(df)).max()
+    print(report.to_markdown(index=False, floatfmt=".3f"))
+    print(f"Max difference in log salary: {difference:.2e} ({len(compiled.roots)} trees, "
+          f"{len(compiled.value):,} nodes)")
+    return report, difference
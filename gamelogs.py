@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+import lxml.html
+import pandas as pd
+import requests
+
+from response_cache import ResponseCache
+from scrape import BASE_URL, CURRENT_SEASON, PAGE_TYPES, Scraper, cache_ttl
+from tables import extract_table, find_table_html, to_typed
+
+
+# Player game-log crawler.
+# For one season it reads the player list from the per-game page, then fetches
+# every player's game log with bounded async concurrency. Rows are appended to
+# <out-dir>/gamelogs_<season>.csv as soon as each player arrives and a checkpoint
+# line is written after every player, so an interrupted crawl resumes where it stopped.
+
+GAMELOG_PATH = "/players/{letter}/{player_id}/gamelog/{season}"
+# Basketball-Reference renamed the table in 2025 ("pgl_basic" before)
+GAMELOG_TABLE_IDS = ["player_game_log_reg", "pgl_basic"]
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0  # seconds, doubled after every failed attempt
+
+
+#-- PLAYER LIST --
+def player_index(html, table_id=PAGE_TYPES["per_game"]["table_id"]):
+    # (player_id, name) for every player in the per-game table.
+    # The id lives in the data-append-csv attribute of the name cell.
+    table = lxml.html.fragment_fromstring(find_table_html(html, table_id))
+    players = {}
+    for cell in table.xpath(".//td[@data-append-csv]"):
+        player_id = cell.get("data-append-csv")
+        if player_id not in players:
+            players[player_id] = cell.text_content().strip()
+    return list(players.items())
+
+
+#-- PARSING --
+def minutes_to_float(value):
+    # "34:12" -> 34.2
+    if not isinstance(value, str) or ":" not in value:
+        return value
+    minutes, seconds = value.split(":")
+    return int(minutes) + int(seconds) / 60
+
+
+class MissingGameLog(ValueError):
+    # The page exists but has no game log table (no games that season)
+    pass
+
+
+def parse_game_log(html, player_id, name, season):
+    df = None
+    for table_id in GAMELOG_TABLE_IDS:
+        try:
+            df = extract_table(html, table_id)
+            break
+        except ValueError:
+            continue
+    if df is None:
+        raise MissingGameLog(f"No game log table for {player_id} {season}")
+
+    # Games the player missed ("Inactive", "Did Not Play"...) have one cell spanning all
+    # the stat columns, so the reason ends up in PTS. Keep it as the Status column.
+    pts = df["PTS"].astype("string")
+    played = pd.to_numeric(df["PTS"], errors="coerce").notna()
+    stat_cols = df.columns[df.columns.get_loc("GS"):] if "GS" in df.columns else ["PTS"]
+    df["Status"] = pts.where(~played, "Played")
+    df.loc[~played, stat_cols] = None
+    # The home/away column has no header ("@" for away games)
+    df = df.rename(columns={"": "Location"})
+    if "MP" in df.columns:
+        df["MP"] = df["MP"].map(minutes_to_float)
+    df = to_typed(df)
+
+    df.insert(0, "Season", season)
+    df.insert(0, "Player", name)
+    df.insert(0, "player_id", player_id)
+    return df
+
+
+#-- OUTPUT + CHECKPOINT --
+class GameLogWriter:
+    # Appends each player's rows to one CSV and records (player_id, byte offset) in the
+    # checkpoint only after the rows are on disk. On resume the CSV is truncated to the
+    # last checkpointed offset, so a crash in the middle of a write leaves no duplicates.
+    def __init__(self, csv_path, checkpoint_path):
+        self.csv_path = Path(csv_path)
+        self.checkpoint_path = Path(checkpoint_path)
+        self.csv_path.parent.mkdir(parents=True, exist_ok=True)
+        self.done = {}
+        self.columns = None
+        offset = 0
+        if self.checkpoint_path.exists():
+            for line in self.checkpoint_path.read_text(encoding="utf-8").splitlines():
+                entry = json.loads(line)
+                self.done[entry["player_id"]] = entry
+                offset = max(offset, entry["offset"])
+        if self.csv_path.exists():
+            with open(self.csv_path, "r+b") as f:
+                f.truncate(offset)
+            if offset:
+                self.columns = pd.read_csv(self.csv_path, nrows=0).columns.tolist()
+        else:
+            self.csv_path.touch()
+
+    def write(self, player_id, df, status="ok"):
+        rows = 0
+        with open(self.csv_path, "a", encoding="utf-8", newline="") as f:
+            if df is not None and len(df):
+                if self.columns is None:
+                    self.columns = df.columns.tolist()
+                    df.to_csv(f, index=False)
+                else:
+                    # Keep the column layout of the first player we wrote
+                    df.reindex(columns=self.columns).to_csv(f, index=False, header=False)
+                rows = len(df)
+            f.flush()
+            os.fsync(f.fileno())
+            offset = f.tell()
+        entry = {"player_id": player_id, "rows": rows, "offset": offset, "status": status}
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.done[player_id] = entry
+
+
+#-- CRAWLER --
+async def fetch_player(scraper, semaphore, player_id, name, season, base_url, retries, backoff):
+    url = base_url + GAMELOG_PATH.format(letter=player_id[0], player_id=player_id, season=season)
+    async with semaphore:
+        for attempt in range(retries + 1):
+            try:
+                body = await asyncio.to_thread(scraper.fetch, url, cache_ttl(season, 24))
+            except requests.HTTPError as e:
+                # A missing page will not appear by retrying
+                if e.response is not None and e.response.status_code == 404:
+                    return player_id, None
+                error = e
+            except requests.RequestException as e:
+                # Connection errors, timeouts and RetryError (the session's own retries on
+                # 429/5xx gave up): back off and try this player again
+                error = e
+            else:
+                try:
+                    return player_id, parse_game_log(body.decode("utf-8", errors="replace"), player_id, name, season)
+                except MissingGameLog:
+                    return player_id, None
+                except Exception as e:
+                    # A parse bug: reported, not checkpointed, so the next run tries again
+                    raise RuntimeError(f"{player_id}: could not parse the game log: {e!r}") from e
+            if attempt < retries:
+                await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random()))
+        raise RuntimeError(f"{player_id}: {error}")
+
+
+async def crawl(players, season, writer, scraper, concurrency=DEFAULT_CONCURRENCY, base_url=BASE_URL,
+                retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = [(player_id, name) for player_id, name in players if player_id not in writer.done]
+    print(f"{len(players) - len(pending)} jugadores ya descargados, {len(pending)} pendientes.")
+    tasks = [
+        asyncio.create_task(fetch_player(scraper, semaphore, player_id, name, season, base_url, retries, backoff))
+        for player_id, name in pending
+    ]
+    failed = []
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        try:
+            player_id, df = await task
+        except RuntimeError as e:
+            # Not checkpointed: it is retried on the next run
+            print(f"Error: {e}")
+            failed.append(str(e))
+            continue
+        writer.write(player_id, df, status="ok" if df is not None else "missing")
+        if done % 25 == 0 or done == len(tasks):
+            print(f"{done}/{len(tasks)} jugadores")
+    return failed
+
+
+def crawl_season(season, out_dir="data/gamelogs", concurrency=DEFAULT_CONCURRENCY, rate=0.3, burst=2,
+                 base_url=BASE_URL, cache_dir=".http_cache", limit=None,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    scraper = Scraper(workers=concurrency, rate=rate, burst=burst, cache=cache)
+    start = time.perf_counter()
+    try:
+        per_game_url = base_url + PAGE_TYPES["per_game"]["path"].format(season=season)
+        html = scraper.fetch(per_game_url, ttl=cache_ttl(season, 24)).decode("utf-8", errors="replace")
+        players = player_index(html)[:limit]
+        writer = GameLogWriter(Path(out_dir) / f"gamelogs_{season}.csv",
+                               Path(out_dir) / f"gamelogs_{season}.checkpoint")
+        failed = asyncio.run(crawl(players, season, writer, scraper, concurrency=concurrency,
+                                   base_url=base_url, retries=retries, backoff=backoff))
+    finally:
+        scraper.close()
+    print(f"\nTemporada {season}: {len(writer.done)}/{len(players)} jugadores en "
+          f"{time.perf_counter() - start:.1f}s ({len(failed)} errores)")
+    if cache is not None:
+        cache.report()
+    return writer.csv_path, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl Basketball-Reference player game logs.")
+    parser.add_argument("--season", type=int, default=CURRENT_SEASON)
+    parser.add_argument("--out-dir", default="data/gamelogs")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=0.3, help="Requests per second per host.")
+    parser.add_argument("--burst", type=int, default=2)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF)
+    parser.add_argument("--limit", type=int, default=None, help="Only crawl the first N players.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--cache-dir", default=".http_cache")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    crawl_season(args.season, out_dir=args.out_dir, concurrency=args.concurrency, rate=args.rate,
+                 burst=args.burst, base_url=args.base_url,
+                 cache_dir=None if args.no_cache else args.cache_dir, limit=args.limit,
+                 retries=args.retries, backoff=args.backoff)
+
+
+if __name__ == "__main__":
+    main()
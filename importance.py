@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from model_registry import data_fingerprint, load_meta, version_dir
+from salary_model import FEATURES, TARGET, split
+
+
+# Permutation importance of the salary model on the test set (instead of the forest's
+# impurity importances, which favour continuous high-cardinality features and split the
+# archetype over its one-hot columns). Columns are permuted in the raw feature table, before
+# the preprocessing, so Player_Archetype is one feature: all its one-hot columns move together.
+# The features are shared between worker processes; every repeat shuffles a sample of
+# max_samples test rows, and forests are scored with the compiled forest (fast_forest.py).
+# Results are cached in the model's registry folder, keyed by the data fingerprint and the
+# settings: re-rendering the figure does not permute anything again.
+
+DEFAULT_REPEATS = 10
+# Test rows per repeat: an int (rows), a fraction, or None for every row
+DEFAULT_MAX_SAMPLES = None
+IMPORTANCE_DIRNAME = "permutation_importance"
+FIGURE_PATH = "visualizations/features_importance.png"
+
+
+def cache_path(version, fingerprint, n_repeats, max_samples, seed):
+    settings = json.dumps([fingerprint, n_repeats, max_samples, seed]).encode()
+    return version_dir(version) / IMPORTANCE_DIRNAME / f"{hashlib.sha256(settings).hexdigest()[:16]}.json"
+
+
+def scoring_model(model):
+    # Compiled forest when the model can be compiled (same predictions, much faster)
+    from fast_forest import CompiledForest
+
+    try:
+        return CompiledForest.from_pipeline(model)
+    except (ValueError, AttributeError, KeyError):
+        return model
+
+
+def r2_rows(y, predicted):
+    # R² of every row of two (repeats x samples) matrices
+    residual = ((y - predicted) ** 2).sum(axis=1)
+    total = ((y - y.mean(axis=1, keepdims=True)) ** 2).sum(axis=1)
+    return 1 - residual / total
+
+
+def _permute_features(model, X, y, features, samples, seed):
+    # For each feature, all the repeats in one predict: the sampled rows of every repeat are
+    # stacked and the feature is shuffled inside each repeat's sample
+    baseline = r2_rows(y[samples], model.predict(X).reshape(-1)[samples])
+    rows = X.iloc[samples.ravel()].reset_index(drop=True)
+    drops = {}
+    for feature in features:
+        rng = np.random.default_rng([seed, X.columns.get_loc(feature)])
+        permuted = rows.copy()
+        permuted[feature] = X[feature].to_numpy()[rng.permuted(samples, axis=1).ravel()]
+        drops[feature] = baseline - r2_rows(y[samples], model.predict(permuted).reshape(samples.shape))
+    return drops
+
+
+def compute_importance(model, X, y, n_repeats=DEFAULT_REPEATS, max_samples=DEFAULT_MAX_SAMPLES,
+                       workers=None, seed=42):
+    # Drop in R² (log salary) when each feature is shuffled, mean and std over the repeats.
+    # The features are split between `workers` processes (default: all cores).
+    from concurrent.futures import ProcessPoolExecutor
+
+    y = np.asarray(y, dtype=float)
+    n_rows = len(X)
+    if max_samples is None:
+        n_samples = n_rows
+    else:
+        n_samples = min(n_rows, max_samples if isinstance(max_samples, int) else max(2, int(max_samples * n_rows)))
+    rng = np.random.default_rng(seed)
+    samples = np.array([rng.choice(n_rows, n_samples, replace=False) for _ in range(n_repeats)])
+
+    model = scoring_model(model)
+    X = X.reset_index(drop=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, X.shape[1]))
+    groups = [list(chunk) for chunk in np.array_split(X.columns.to_numpy(), workers)]
+    if workers == 1:
+        drops = _permute_features(model, X, y, groups[0], samples, seed)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_permute_features, model, X, y, group, samples, seed) for group in groups]
+            drops = {feature: drop for future in futures for feature, drop in future.result().items()}
+    return pd.DataFrame({"feature": list(drops),
+                         "importance_mean": [d.mean() for d in drops.values()],
+                         "importance_std": [d.std() for d in drops.values()]}).sort_values(
+        by="importance_mean", ascending=False, ignore_index=True)
+
+
+def permutation_importances(version=None, n_repeats=DEFAULT_REPEATS, max_samples=DEFAULT_MAX_SAMPLES,
+                            workers=None, seed=42, refresh=False):
+    # (importances, cached): from the cache when the model, the test set and the settings
+    # are the same, else computed and cached
+    from artifacts import load_artifact
+
+    meta = load_meta(version)
+    # The split is fixed (random_state), so the whole table identifies the test set and a
+    # cache hit needs neither the split nor scikit-learn
+    df = load_artifact("nba_data_with_archetypes", columns=FEATURES + [TARGET])
+    fingerprint = data_fingerprint(df, FEATURES + [TARGET])
+    path = cache_path(meta["version"], fingerprint, n_repeats, max_samples, seed)
+    if path.exists() and not refresh:
+        return pd.DataFrame(json.loads(path.read_text())["importances"]), True
+
+    from model_registry import load_model
+
+    _, X_test, _, Y_test = split(df)
+    importances = compute_importance(load_model(meta["version"]), X_test[meta["features"]], Y_test,
+                                     n_repeats, max_samples, workers, seed)
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps({
+        "version": meta["version"], "data_fingerprint": fingerprint, "n_repeats": n_repeats,
+        "max_samples": max_samples, "seed": seed, "n_rows": len(X_test),
+        "importances": importances.to_dict(orient="list"),
+    }, indent=1))
+    return importances, False
+
+
+def render_importance_plot(importances, path=FIGURE_PATH, top_n=25):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    top = importances.head(top_n).iloc[::-1]
+    plt.figure(figsize=(10, 8))
+    plt.barh(top["feature"], top["importance_mean"], xerr=top["importance_std"], color="steelblue")
+    plt.title("Permutation Importance (test set)")
+    plt.xlabel("Decrease in R² (log salary)")
+    plt.grid(True, axis="x", alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    return path
+
+
+def run(version=None, n_repeats=DEFAULT_REPEATS, max_samples=DEFAULT_MAX_SAMPLES, workers=None,
+        refresh=False, plot=True):
+    importances, cached = permutation_importances(version, n_repeats, max_samples, workers, refresh=refresh)
+    print(f"\n--- Permutation Importance on the Test Set ({'cached' if cached else 'computed'}, "
+          f"{n_repeats} repeats) ---")
+    print(importances.head(25).to_markdown(index=False, floatfmt=(None, ".4f", ".4f")))
+    if plot:
+        print(f"Figure saved to '{render_importance_plot(importances)}'")
+    return importances
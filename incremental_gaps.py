@@ -0,0 +1,171 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sortedcontainers import SortedList
+
+from artifacts import load_artifact, save_artifact
+from fast_forest import load_predictor
+from salary_model import FEATURES, IN_SAMPLE, TARGET, interval_bounds, print_reports
+
+
+# Incremental value gaps: apply a delta (a few trades, signings or stat corrections) to the
+# scored table without re-predicting ~400 players or re-sorting / re-grouping everything.
+# Only the rows whose model features changed are re-scored (a salary change only moves the
+# gap); they are predicted by every tree, so their Prediction_Source is "in-sample" while the
+# rest of the table keeps its out-of-fold points and intervals. The reports are kept in
+# order-statistic structures:
+#   - every (Value_Gap, Player) in one SortedList: the 20 most underpaid / overpaid are its ends
+#   - per archetype: a SortedList of gaps (median) and a running sum / count (mean)
+# Each changed player costs O(log n); reports() returns the same three tables as
+# salary_model.value_gap_reports.
+
+TOP_N = 20
+
+
+class ValueGapReports:
+    def __init__(self, df):
+        if df["Player"].duplicated().any():
+            raise ValueError("Player names must be unique to apply deltas")
+        self.df = df.set_index("Player", drop=False)
+        self.ranking = SortedList()
+        self.by_archetype = {}
+        for player, archetype, gap in zip(self.df["Player"], self.df["Player_Archetype"], self.df["Value_Gap"]):
+            self._add(player, archetype, gap)
+
+    def _add(self, player, archetype, gap):
+        if pd.isna(gap):
+            raise ValueError(f"{player}: no value gap")  # NaN would break the sorted order
+        self.ranking.add((gap, player))
+        group = self.by_archetype.setdefault(archetype, {"gaps": SortedList(), "sum": 0.0})
+        group["gaps"].add(gap)
+        group["sum"] += gap
+
+    def _remove(self, player, archetype, gap):
+        self.ranking.remove((gap, player))
+        group = self.by_archetype[archetype]
+        group["gaps"].remove(gap)
+        group["sum"] -= gap
+        if not group["gaps"]:
+            del self.by_archetype[archetype]
+
+    def apply(self, delta, predict, assign_archetype=None, predict_trees=None):
+        # delta: Player (once each) + the columns that changed (blank = unchanged). New players
+        # need Salary and every model feature; a ValueError leaves the reports untouched.
+        # predict: log-salary predictor (e.g. CompiledForest.predict); assign_archetype: labels
+        # the changed rows again when their clustering stats moved (clustering.assign_archetype);
+        # predict_trees: per-tree predictor (CompiledForest.predict_trees), refreshes the
+        # prediction intervals of the re-scored rows
+        duplicated = delta["Player"].duplicated()
+        if duplicated.any():
+            raise ValueError(f"Players listed more than once in the delta: "
+                             f"{', '.join(delta.loc[duplicated, 'Player'].unique())}")
+        delta = delta.set_index("Player", drop=False)
+        new = delta.index.difference(self.df.index)
+        before = self.df.reindex(delta.index)
+        # Blank cells of the delta keep the current value
+        updated = before.copy()
+        for column in delta.columns:
+            updated[column] = delta[column].where(delta[column].notna(), before.get(column))
+        written = list(delta.columns)
+        if assign_archetype is not None:
+            updated[["Archetype_ID", "Player_Archetype"]] = assign_archetype(updated)
+            written += [c for c in ["Archetype_ID", "Player_Archetype"] if c not in written]
+
+        incomplete = updated[["Salary"] + FEATURES].isna().any(axis=1)
+        if incomplete.any():
+            raise ValueError(f"Missing Salary or model features (new players need all of them): "
+                             f"{', '.join(incomplete.index[incomplete])}")
+        # Only the rows whose model features actually changed are re-scored; a new archetype
+        # is a feature change, a salary change only moves the gap
+        changed = (updated[FEATURES] != before[FEATURES]).any(axis=1)
+        rescore = delta.index[changed.to_numpy() | delta.index.isin(new)]
+
+        for column in written:
+            if column not in self.df.columns:
+                self.df[column] = np.nan
+        existing = delta.index.difference(new)
+        if len(existing):
+            self.df.loc[existing, written] = updated.loc[existing, written]
+        if new.size:
+            self.df = pd.concat([self.df, updated.loc[new].reindex(columns=self.df.columns)])
+        rows = self.df.loc[delta.index]
+        if len(rescore):
+            if predict_trees is not None and "Predicted_Low" in self.df.columns:
+                per_tree = predict_trees(rows.loc[rescore, FEATURES])
+                log_salary = per_tree.mean(axis=1)
+                low, high = interval_bounds(per_tree)
+                self.df.loc[rescore, "Predicted_Low"], self.df.loc[rescore, "Predicted_High"] = low, high
+                self.df.loc[rescore, "Interval_Width"] = high - low
+            else:
+                log_salary = predict(rows.loc[rescore, FEATURES])
+            self.df.loc[rescore, "Predicted_Salary"] = np.exp(log_salary) - 1
+            # Every tree scores these rows (no out-of-fold models here): in-sample points and
+            # intervals next to the out-of-fold ones, so they are marked
+            self.df.loc[rescore, "Prediction_Source"] = IN_SAMPLE
+        self.df.loc[delta.index, "Value_Gap"] = (self.df.loc[delta.index, "Salary"]
+                                                 - self.df.loc[delta.index, "Predicted_Salary"])
+        if TARGET in self.df.columns:
+            self.df.loc[delta.index, TARGET] = np.log(self.df.loc[delta.index, "Salary"] + 1)
+        if "Significant_Gap" in self.df.columns:
+            current = self.df.loc[delta.index]
+            self.df.loc[delta.index, "Significant_Gap"] = ((current["Salary"] < current["Predicted_Low"])
+                                                           | (current["Salary"] > current["Predicted_High"]))
+            # New players were concatenated without it (object column)
+            self.df["Significant_Gap"] = self.df["Significant_Gap"].astype(bool)
+
+        for player in delta.index:
+            if player not in new:
+                self._remove(player, before.at[player, "Player_Archetype"], before.at[player, "Value_Gap"])
+            self._add(player, self.df.at[player, "Player_Archetype"], self.df.at[player, "Value_Gap"])
+        return len(rescore)
+
+    def reports(self, top_n=TOP_N):
+        bargain_targets = self.df.loc[[player for _, player in self.ranking[:top_n]]]
+        overpaid_targets = self.df.loc[[player for _, player in reversed(self.ranking[-top_n:])]]
+        strategic_insight = pd.DataFrame(
+            {"Avg_Value_Gap": [g["sum"] / len(g["gaps"]) for g in self.by_archetype.values()],
+             "Player_Count": [len(g["gaps"]) for g in self.by_archetype.values()],
+             "Median_Value_Gap": [_median(g["gaps"]) for g in self.by_archetype.values()]},
+            index=pd.Index(list(self.by_archetype), name="Player_Archetype"),
+        ).sort_values(by="Avg_Value_Gap", ascending=True)
+        return (bargain_targets.reset_index(drop=True), overpaid_targets.reset_index(drop=True),
+                strategic_insight)
+
+
+def _median(values):
+    n = len(values)
+    return values[n // 2] if n % 2 else (values[n // 2 - 1] + values[n // 2]) / 2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a delta of player changes to the value-gap reports.")
+    parser.add_argument("delta", help="CSV with Player + the changed columns (Salary, stats, new players).")
+    parser.add_argument("--version", type=int, default=None, help="Salary model version (default: latest).")
+    parser.add_argument("--no-archetypes", action="store_true",
+                        help="Keep the current archetypes instead of re-assigning the changed players.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the reports without saving.")
+    args = parser.parse_args(argv)
+
+    from clustering import CLUSTERING_FEATURES, assign_archetype
+
+    delta = pd.read_csv(args.delta)
+    reports = ValueGapReports(load_artifact("dataset_visualizations"))
+    predictor, _ = load_predictor(args.version)
+    predict, predict_trees = predictor.predict, getattr(predictor, "predict_trees", None)
+    moved = [c for c in delta.columns if c in CLUSTERING_FEATURES]
+    relabel = None if args.no_archetypes or not moved else assign_archetype
+
+    start = time.perf_counter()
+    rescored = reports.apply(delta, predict, relabel, predict_trees)
+    tables = reports.reports()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{len(delta)} changed players ({rescored} re-scored) -> reports refreshed in {elapsed:.1f} ms")
+    print_reports(*tables)
+    if not args.dry_run:
+        save_artifact(reports.df.reset_index(drop=True), "dataset_visualizations", csv=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Versioned store of the trained salary models (randomforest.py -> models/salary/vNNN/).
+# Each version keeps:
+#   pipeline.joblib  the fitted sklearn Pipeline (uncompressed). sklearn copies the node
+#                    arrays of every tree when it is unpickled, so memory-mapping it does not
+#                    share anything: it is loaded normally (~80 ms for the forest)
+#   trees/*.npy      forests only: every node of every tree packed into flat arrays, opened
+#                    with np.load(mmap_mode="r") in ~2 ms; several processes share one copy
+#                    in page cache
+#   oof_predictions.npy  out-of-fold predictions of the training rows (from the search)
+#   meta.json        engine, features, target, parameters, metrics, the fingerprint of the
+#                    training data and (forests) the fitted preprocessing as plain numbers
+# LATEST holds the number of the newest version.
+
+REGISTRY_DIR = Path("models") / "salary"
+TREE_ARRAYS = ["feature", "threshold", "left", "right", "value", "roots", "missing_left"]
+
+
+def data_fingerprint(df, columns):
+    # Content hash of the training table (row order included)
+    hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes() + json.dumps(list(columns)).encode()).hexdigest()
+
+
+def version_dir(version, registry_dir=REGISTRY_DIR):
+    return Path(registry_dir) / f"v{int(version):03d}"
+
+
+def latest_version(registry_dir=REGISTRY_DIR):
+    path = Path(registry_dir) / "LATEST"
+    if not path.exists():
+        raise FileNotFoundError(f"No model in {Path(registry_dir)} (run `python cli.py train`)")
+    return int(path.read_text())
+
+
+def pack_forest(forest):
+    # All the trees of a fitted forest in contiguous arrays. Node ids are global; leaves point
+    # to themselves (left = right = own id), so a traversal can run a fixed number of steps.
+    # missing_left: the child a NaN goes to at each split (learned by sklearn, or the child
+    # with most samples when the feature had no missing values in training).
+    sizes = [est.tree_.node_count for est in forest.estimators_]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+    feature, threshold, left, right, value, missing_left = [], [], [], [], [], []
+    for est, offset in zip(forest.estimators_, offsets):
+        tree = est.tree_
+        ids = np.arange(tree.node_count, dtype=np.int32) + offset
+        leaf = tree.children_left == -1
+        feature.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(np.where(leaf, 0.0, tree.threshold))
+        left.append(np.where(leaf, ids, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(leaf, ids, tree.children_right + offset).astype(np.int32))
+        value.append(tree.value[:, 0, 0])
+        missing_left.append(np.asarray(tree.missing_go_to_left, dtype=bool))
+    return {"feature": np.concatenate(feature), "threshold": np.concatenate(threshold),
+            "left": np.concatenate(left), "right": np.concatenate(right),
+            "value": np.concatenate(value), "roots": offsets,
+            "missing_left": np.concatenate(missing_left)}
+
+
+def preprocessing_params(model):
+    # The fitted ColumnTransformer as plain numbers: scaler statistics of the numeric
+    # columns (None = passthrough) and the categories of the one-hot columns
+    preprocessor = model.named_steps["preprocessor"]
+    params = {"numeric": [], "mean": None, "scale": None, "categorical": []}
+    for name, transformer, columns in preprocessor.transformers_:
+        step = transformer.steps[0][1] if hasattr(transformer, "steps") else transformer
+        if name == "num":
+            params["numeric"] = list(columns)
+            if hasattr(step, "mean_"):
+                params["mean"], params["scale"] = step.mean_.tolist(), step.scale_.tolist()
+        elif name == "cat":
+            if not hasattr(step, "drop_idx_"):
+                return None  # not one-hot (e.g. hgb's ordinal codes)
+            params["categorical"] = [{"column": column, "categories": list(categories)}
+                                     for column, categories in zip(columns, step.categories_)]
+    return params
+
+
+def register_model(model, train_df, features, target, metrics=None, params=None, engine=None,
+                   oof_predictions=None, registry_dir=REGISTRY_DIR):
+    import joblib
+    import sklearn
+
+    registry_dir = Path(registry_dir)
+    versions = [int(p.name[1:]) for p in registry_dir.glob("v[0-9]*") if p.is_dir()]
+    version = max(versions, default=0) + 1
+    path = version_dir(version, registry_dir)
+    path.mkdir(parents=True)
+
+    joblib.dump(model, path / "pipeline.joblib")
+    regressor = model.named_steps["regressor"]
+    packed = hasattr(regressor, "estimators_") and hasattr(regressor.estimators_[0], "tree_")
+    if packed:
+        (path / "trees").mkdir()
+        for name, array in pack_forest(regressor).items():
+            np.save(path / "trees" / f"{name}.npy", np.ascontiguousarray(array))
+
+    if oof_predictions is not None:
+        np.save(path / "oof_predictions.npy",
+                np.column_stack([oof_predictions.index.to_numpy(dtype=float), oof_predictions.to_numpy()]))
+
+    meta = {
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "engine": engine,
+        "features": list(features),
+        "target": target,
+        "params": {k: (v.item() if hasattr(v, "item") else v) for k, v in (params or {}).items()},
+        "metrics": {k: float(v) for k, v in (metrics or {}).items()},
+        "n_train": len(train_df),
+        "data_fingerprint": data_fingerprint(train_df, list(features) + [target]),
+        "packed_trees": packed,
+        "preprocessing": preprocessing_params(model) if packed else None,
+        "sklearn": sklearn.__version__,
+        "python": platform.python_version(),
+    }
+    (path / "meta.json").write_text(json.dumps(meta, indent=1))
+    # Written last: readers never see a half-written version
+    (registry_dir / "LATEST").write_text(str(version))
+    return meta
+
+
+def load_meta(version=None, registry_dir=REGISTRY_DIR):
+    version = version or latest_version(registry_dir)
+    return json.loads((version_dir(version, registry_dir) / "meta.json").read_text())
+
+
+def load_model(version=None, mmap=False, registry_dir=REGISTRY_DIR):
+    import joblib
+
+    version = version or latest_version(registry_dir)
+    return joblib.load(version_dir(version, registry_dir) / "pipeline.joblib", mmap_mode="r" if mmap else None)
+
+
+def load_tree_arrays(version=None, mmap=True, registry_dir=REGISTRY_DIR):
+    # Read-only memory maps of the packed forest (nothing is copied until it is used)
+    version = version or latest_version(registry_dir)
+    trees = version_dir(version, registry_dir) / "trees"
+    if not trees.exists():
+        raise FileNotFoundError(f"Model v{int(version):03d} has no packed trees (not a forest)")
+    # Versions packed before missing_left was stored simply lack it
+    return {name: np.load(trees / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in TREE_ARRAYS if (trees / f"{name}.npy").exists()}
+
+
+def load_oof_predictions(version=None, registry_dir=REGISTRY_DIR):
+    # Out-of-fold log predictions of the training rows (index = row labels of the dataset)
+    version = version or latest_version(registry_dir)
+    path = version_dir(version, registry_dir) / "oof_predictions.npy"
+    if not path.exists():
+        return None
+    saved = np.load(path)
+    return pd.Series(saved[:, 1], index=saved[:, 0].astype(np.int64))
+
+
+def list_models(registry_dir=REGISTRY_DIR):
+    rows = []
+    for path in sorted(Path(registry_dir).glob("v[0-9]*")):
+        meta = json.loads((path / "meta.json").read_text())
+        rows.append({"version": meta["version"], "created": meta["created"], "engine": meta["engine"],
+                     "n_train": meta["n_train"], "r2": meta["metrics"].get("r2"),
+                     "mae": meta["metrics"].get("mae"), "data": meta["data_fingerprint"][:12]})
+    return pd.DataFrame(rows)
@@ -0,0 +1,121 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+
+# Player-name join layer.
+# Basketball-Reference pages do not always spell a player the same way ("Dončić" /
+# "Doncic", "Jr." / no suffix, "P.J." / "PJ"). Names are matched in three steps:
+#   1. exact name
+#   2. normalized key (no accents, punctuation or suffixes, lower case)
+#   3. fuzzy match, only against the few names that share a blocking key (first or
+#      last name) and were not already claimed by steps 1-2
+# so matching stays near-linear in the number of players.
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+FUZZY_CUTOFF = 0.85
+
+
+def normalize_name(name):
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    name = re.sub(r"[.'`]", "", name.lower())
+    tokens = [t for t in re.split(r"[\s\-]+", name) if t and t not in SUFFIXES]
+    return " ".join(tokens)
+
+
+def blocking_keys(norm):
+    tokens = norm.split()
+    if not tokens:
+        return []
+    return [f"first:{tokens[0]}", f"last:{tokens[-1]}"]
+
+
+def fuzzy_score(a, b):
+    # Similarity of two normalized names. The first names must be compatible (same,
+    # one a short form of the other like "cam" / "cameron", or a close spelling);
+    # then the score is the similarity of the rest of the name.
+    # This keeps "josh richardson" away from "jase richardson".
+    first_a, _, rest_a = a.partition(" ")
+    first_b, _, rest_b = b.partition(" ")
+    if not (first_a.startswith(first_b) or first_b.startswith(first_a)
+            or SequenceMatcher(None, first_a, first_b).ratio() >= 0.8):
+        return 0.0
+    return SequenceMatcher(None, rest_a, rest_b).ratio()
+
+
+class NameIndex:
+    # Index over the names of the right-hand table of a join
+    def __init__(self, names):
+        self.names = set()
+        self.by_norm = {}
+        self.blocks = {}
+        for name in pd.unique(pd.Series(names).dropna()):
+            self.names.add(name)
+            norm = normalize_name(name)
+            self.by_norm.setdefault(norm, name)
+            for key in blocking_keys(norm):
+                self.blocks.setdefault(key, set()).add(norm)
+
+    def resolve(self, names, cutoff=FUZZY_CUTOFF):
+        # Returns {left name: (right name or None, method)} for every unique left name
+        unique = pd.unique(pd.Series(names).dropna())
+        matches = {}
+        claimed = set()
+        pending = []
+        for name in unique:
+            if name in self.names:
+                matches[name] = (name, "exact")
+                claimed.add(normalize_name(name))
+        for name in unique:
+            if name in matches:
+                continue
+            norm = normalize_name(name)
+            if norm in self.by_norm and norm not in claimed:
+                matches[name] = (self.by_norm[norm], "normalized")
+                claimed.add(norm)
+            else:
+                pending.append((name, norm))
+        for name, norm in pending:
+            candidates = set()
+            for key in blocking_keys(norm):
+                candidates |= self.blocks.get(key, set())
+            best, best_score = None, cutoff
+            for candidate in candidates - claimed:
+                score = fuzzy_score(norm, candidate)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is None:
+                matches[name] = (None, "unmatched")
+            else:
+                matches[name] = (self.by_norm[best], "fuzzy")
+                claimed.add(best)
+        return matches
+
+
+def merge_on_player(left, right, how="inner", on="Player", cutoff=FUZZY_CUTOFF, label=None):
+    # pd.merge(left, right, on="Player") that tolerates spelling differences.
+    # The left table keeps its own spelling of the name.
+    matches = NameIndex(right[on]).resolve(left[on], cutoff=cutoff)
+    key = left[on].map(lambda name: matches.get(name, (None,))[0])
+    # Unmatched left names and missing right names get keys that match nothing (pandas
+    # joins None/NaN keys to each other)
+    key = key.where(key.notna(), [f"\0left-{i}" for i in range(len(left))])
+    right_key = right[on].where(right[on].notna(), [f"\0right-{i}" for i in range(len(right))])
+    merged = pd.merge(left.assign(_player_key=key),
+                      right.drop(columns=on).assign(_player_key=right_key),
+                      how=how, on="_player_key")
+    merged = merged.drop(columns="_player_key")
+
+    methods = pd.Series([method for _, method in matches.values()], dtype="object").value_counts()
+    print(f"--- NAME MATCHING{f' ({label})' if label else ''} ---")
+    print(f"Left: {left[on].nunique()} names | Right: {right[on].nunique()} names | "
+          f"exact: {methods.get('exact', 0)}, normalized: {methods.get('normalized', 0)}, "
+          f"fuzzy: {methods.get('fuzzy', 0)}, unmatched: {methods.get('unmatched', 0)}")
+    fuzzy = [(name, match) for name, (match, method) in matches.items() if method == "fuzzy"]
+    for name, match in fuzzy:
+        print(f"  fuzzy: {name} -> {match}")
+    return merged
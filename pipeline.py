@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+# Incremental runner for the whole workflow (scrape -> main.py -> k-means.py -> randomforest.py).
+# Every stage declares the files it reads (deps), the code it runs (code), its parameters
+# and the files it writes (outs). Its fingerprint is the sha256 of all of that, so a stage
+# only runs again when one of its inputs, its code or its parameters actually changed.
+# Because deps are hashed by content, a re-scrape that produces the same CSV does not
+# re-run anything downstream, and new salary data does not re-scrape the stats pages.
+
+ROOT = Path(__file__).resolve().parent
+STATE_FILE = ROOT / ".pipeline" / "state.json"
+PYTHON = sys.executable
+
+SCRAPE_CODE = ["scrape.py", "tables.py", "response_cache.py"]
+
+STAGES = [
+    # Sources: they read nothing from disk, so they only run when their code or params
+    # change, their outputs are missing, or they are forced (--force scrape_contracts).
+    # Outputs that already exist on the first run are adopted as they are.
+    {"name": "scrape_per_game", "deps": [], "code": SCRAPE_CODE, "params": {"pages": "per_game"},
+     "cmd": [PYTHON, "scrape.py", "--pages", "per_game", "--out-dir", "data"],
+     "outs": ["data/nba_stats_per_game_regular_season.csv"]},
+    {"name": "scrape_advanced", "deps": [], "code": SCRAPE_CODE, "params": {"pages": "advanced"},
+     "cmd": [PYTHON, "scrape.py", "--pages", "advanced", "--out-dir", "data"],
+     "outs": ["data/nba_advanced_stats_2025.csv"]},
+    {"name": "scrape_standings", "deps": [], "code": SCRAPE_CODE, "params": {"pages": "standings"},
+     "cmd": [PYTHON, "scrape.py", "--pages", "standings", "--out-dir", "data"],
+     "outs": ["data/expanded_standings.csv"]},
+    {"name": "scrape_contracts", "deps": [], "code": SCRAPE_CODE, "params": {"pages": "contracts"},
+     "cmd": [PYTHON, "scrape.py", "--pages", "contracts", "--out-dir", "data"],
+     "outs": ["data/nba_salaries_2024_2025_raw.csv"]},
+
+    {"name": "clean",
+     "deps": ["data/nba_stats_per_game_regular_season.csv", "data/nba_advanced_stats_2025.csv",
+              "data/expanded_standings.csv", "data/nba_salaries_2024_2025_raw.csv"],
+     "code": ["cleaning.py", "aggregate.py", "dedupe.py", "names.py", "artifacts.py"], "params": {},
+     "cmd": [PYTHON, "cli.py", "clean"],
+     "outs": ["data/final_nba_dataset.parquet", "data/stats_final.parquet"]},
+    {"name": "cluster",
+     "deps": ["data/final_nba_dataset.parquet"],
+     "code": ["clustering.py", "artifacts.py"], "params": {},
+     "cmd": [PYTHON, "cli.py", "cluster"],
+     "outs": ["data/nba_data_with_archetypes.parquet", "data/elbow_sweep.parquet",
+              "data/archetype_model/latest.json"]},
+    {"name": "cluster_plots",
+     "deps": ["data/nba_data_with_archetypes.parquet", "data/elbow_sweep.parquet"],
+     "code": ["plots.py", "artifacts.py"], "params": {},
+     "cmd": [PYTHON, "cli.py", "plots"],
+     "outs": ["visualizations/hist_salary_log.png", "visualizations/elbow_plot.png"]},
+    {"name": "model",
+     "deps": ["data/nba_data_with_archetypes.parquet"],
+     "code": ["salary_model.py", "model_registry.py", "fast_forest.py", "artifacts.py"], "params": {},
+     "cmd": [PYTHON, "cli.py", "train"],
+     "outs": ["data/dataset_visualizations.parquet", "data/dataset_visualizations.csv",
+              "models/salary/LATEST"]},
+    {"name": "importance_plot",
+     "deps": ["data/nba_data_with_archetypes.parquet", "models/salary/LATEST"],
+     "code": ["importance.py", "fast_forest.py", "salary_model.py", "model_registry.py", "artifacts.py"],
+     "params": {},
+     "cmd": [PYTHON, "cli.py", "importance"],
+     "outs": ["visualizations/features_importance.png"]},
+]
+
+
+#-- FINGERPRINTS --
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(ROOT / path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stage_fingerprint(stage):
+    h = hashlib.sha256()
+    for path in sorted(stage["deps"]) + sorted(stage["code"]):
+        h.update(path.encode())
+        h.update(file_hash(path).encode() if (ROOT / path).exists() else b"missing")
+    h.update(json.dumps(stage["params"], sort_keys=True).encode())
+    h.update(json.dumps(stage["cmd"][1:]).encode())
+    return h.hexdigest()
+
+
+def load_state():
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text())
+    return {}
+
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATE_FILE.write_text(json.dumps(state, indent=2))
+
+
+def why_run(stage, state, forced):
+    # Returns the reason to run the stage, or None when it is up to date
+    if stage["name"] in forced:
+        return "forced"
+    previous = state.get(stage["name"])
+    outs_exist = all((ROOT / out).exists() for out in stage["outs"])
+    if previous is None:
+        # Source data already on disk (e.g. the CSVs in the repo): adopt it instead of re-scraping
+        return "adopt" if not stage["deps"] and outs_exist else "never run"
+    for out in stage["outs"]:
+        if not (ROOT / out).exists():
+            return f"missing output {out}"
+        if previous["outs"].get(out) != file_hash(out):
+            # New source data dropped in by hand is kept; derived outputs are rebuilt
+            return "adopt" if not stage["deps"] else f"output {out} changed outside the pipeline"
+    if previous["fingerprint"] != stage_fingerprint(stage):
+        return "inputs, code or params changed"
+    return None
+
+
+#-- GRAPH --
+def select_stages(targets):
+    # The targets plus every stage they (transitively) depend on, in declaration order
+    producers = {out: stage["name"] for stage in STAGES for out in stage["outs"]}
+    by_name = {stage["name"]: stage for stage in STAGES}
+    wanted = set()
+    todo = list(targets or by_name)
+    while todo:
+        name = todo.pop()
+        if name not in by_name:
+            raise SystemExit(f"Unknown stage '{name}'. Stages: {', '.join(by_name)}")
+        if name in wanted:
+            continue
+        wanted.add(name)
+        todo.extend(producers[dep] for dep in by_name[name]["deps"] if dep in producers)
+    return [stage for stage in STAGES if stage["name"] in wanted]
+
+
+def record(state, stage, seconds):
+    state[stage["name"]] = {
+        "fingerprint": stage_fingerprint(stage),
+        "outs": {out: file_hash(out) for out in stage["outs"]},
+        "seconds": round(seconds, 2),
+    }
+    save_state(state)
+
+
+def run(targets=None, forced=(), dry_run=False):
+    state = load_state()
+    env = dict(os.environ, MPLBACKEND="Agg")
+    for stage in select_stages(targets):
+        reason = why_run(stage, state, set(forced))
+        if reason == "adopt":
+            print(f"[keep] {stage['name']} (using the files on disk)")
+            if not dry_run:
+                record(state, stage, 0)
+            continue
+        if reason is None:
+            print(f"[skip] {stage['name']} (up to date)")
+            continue
+        print(f"[run]  {stage['name']} ({reason})")
+        if dry_run:
+            continue
+        start = time.perf_counter()
+        subprocess.run(stage["cmd"], cwd=ROOT, env=env, check=True)
+        record(state, stage, time.perf_counter() - start)
+        print(f"[done] {stage['name']} in {state[stage['name']]['seconds']}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pipeline, skipping stages that did not change.")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all).")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="Run these stages anyway.")
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would run and why.")
+    args = parser.parse_args(argv)
+    run(args.targets, forced=args.force, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from artifacts import load_artifact
+
+# Figures of the clustering phase, rendered from the saved artifacts so that changing
+# a plot never re-runs the clustering (see pipeline.py). Rendering is headless (Agg).
+
+
+def render_cluster_plots():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    #-- SALARY HISTOGRAM (log scale) --
+    df = load_artifact("nba_data_with_archetypes", columns=["Salary_log"])
+    plt.figure(figsize=(5, 5))
+    ax = df["Salary_log"].plot.hist(bins=50)
+    ax.set_xlabel("Salary log")
+    plt.savefig("visualizations/hist_salary_log.png")
+    plt.close()
+
+    #-- ELBOW PLOT --
+    sweep = load_artifact("elbow_sweep")
+    plt.figure(figsize=(10, 6))
+    plt.plot(sweep["k"], sweep["wcss"], marker='o', linestyle='--')
+    plt.title('Elbow Method for Optimal K')
+    plt.xlabel('Number of Clusters (K)')
+    plt.ylabel('WCSS (Inertia)')
+    plt.grid(True, alpha=0.5)
+    plt.savefig("visualizations/elbow_plot.png")
+    plt.close()
+    print("Plots saved to 'visualizations/'")
+
+
+if __name__ == "__main__":
+    render_cluster_plots()
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+# On-disk HTTP response cache used by scrape.py.
+# Every URL is stored under the sha256 of the URL: <key>.html holds the body and
+# <key>.json the validators (ETag / Last-Modified) and the time it was fetched.
+class ResponseCache:
+    def __init__(self, cache_dir=".http_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0, "bytes_downloaded": 0}
+
+    def key(self, url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def paths(self, url):
+        key = self.key(url)
+        return self.cache_dir / f"{key}.html", self.cache_dir / f"{key}.json"
+
+    def load(self, url):
+        body_path, meta_path = self.paths(url)
+        if not body_path.exists() or not meta_path.exists():
+            return None, None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        return body_path.read_bytes(), meta
+
+    def is_fresh(self, meta, ttl):
+        # ttl=None means the page never changes (historical seasons)
+        if ttl is None:
+            return True
+        return time.time() - meta["fetched_at"] < ttl
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, url, body, headers):
+        body_path, meta_path = self.paths(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "size": len(body),
+        }
+        # Write to a temporary file first so a crash never leaves half a page behind
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def touch(self, url, meta):
+        # A 304 answer: the cached body is still valid, restart its TTL
+        _, meta_path = self.paths(url)
+        meta = dict(meta, fetched_at=time.time())
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.stats[name] += n
+
+    def report(self):
+        s = self.stats
+        print("\n--- HTTP CACHE ---")
+        print(f"Hits: {s['hits']} | Revalidated (304): {s['revalidated']} | Misses: {s['misses']}")
+        print(f"Downloaded: {s['bytes_downloaded'] / 1e6:,.2f} MB | Saved: {s['bytes_saved'] / 1e6:,.2f} MB")
+
+    def _write_atomic(self, path, data):
+        tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,477 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from artifacts import load_artifact, save_artifact
+
+#-- PHASE 3: SALARY MODEL (RANDOM FOREST) --
+# scikit-learn / scipy are imported inside the functions that need them, so importing this
+# module for its feature lists (or the reports) does not pay for sklearn.ensemble.
+
+NUMERIC_FEATURES = [
+    "Minutes Played",
+    "PTS",
+    "Age",
+    "Games Played",
+    "True Shooting",
+    "Offensive Production per Minute",
+    "3PAr",
+    "Field Goals Assisted",
+    "Plays Used",
+    "Win_Pct",
+    "Win Shares",
+    "Value Over Replacement"
+]
+CATEGORICAL_FEATURES = ["Player_Archetype"]
+FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+TARGET = "Salary_log"
+
+REPORT_COLUMNS = ['Player', 'Player_Archetype', 'Salary', 'Predicted_Salary', 'Value_Gap']
+REPORT_FLOATFMT = (None, "s", "s", ",.0f", ",.0f", ",.0f")
+# Prediction interval of Predicted_Salary: central share of the trees' predictions
+INTERVAL_COLUMNS = ['Predicted_Low', 'Predicted_High', 'Interval_Width']
+INTERVAL_COVERAGE = 0.8
+# Prediction_Source of the final model's own predictions (every tree, in-sample for its training
+# rows), as opposed to "out-of-fold" / "holdout": no out-of-fold predictions, or a row re-scored
+# by an incremental delta (incremental_gaps.py)
+IN_SAMPLE = "in-sample"
+
+
+# Regressors that can sit behind the same features, preprocessing and search.
+# encoding: how Player_Archetype reaches the regressor (one-hot columns, or integer codes
+# for the native categorical splits of HistGradientBoosting); scaling: whether the numeric
+# features must be standardized; resource: what the halving search grows (param, max).
+ENGINES = {
+    "forest": {"encoding": "onehot", "scaling": False, "resource": ("regressor__n_estimators", 500)},
+    "hgb": {"encoding": "ordinal", "scaling": False, "resource": ("regressor__max_iter", 500)},
+    "linear": {"encoding": "onehot", "scaling": True, "resource": ("n_samples", None)},
+}
+DEFAULT_ENGINE = "forest"
+
+
+def param_distributions(engine=DEFAULT_ENGINE):
+    from scipy.stats import loguniform, randint, uniform
+
+    # Range of parameters to test
+    if engine == "hgb":
+        return {
+            'regressor__max_iter': randint(100, 500),
+            'regressor__learning_rate': loguniform(0.02, 0.3),
+            'regressor__max_leaf_nodes': randint(8, 64),
+            'regressor__min_samples_leaf': randint(5, 40),
+            'regressor__l2_regularization': uniform(0, 1)
+        }
+    if engine == "linear":
+        return {'regressor__alpha': loguniform(1e-2, 1e3)}
+    return {
+        'regressor__n_estimators': randint(low=100, high=500),
+        'regressor__max_depth': [10, 15, 20, 30, None],
+        'regressor__min_samples_leaf': randint(1, 10),
+        'regressor__max_features': [0.6, 0.8, 1.0]
+    }
+
+
+def build_regressor(engine=DEFAULT_ENGINE):
+    if engine == "hgb":
+        from sklearn.ensemble import HistGradientBoostingRegressor
+
+        # The archetype code is the last column after the preprocessor
+        return HistGradientBoostingRegressor(categorical_features=[len(NUMERIC_FEATURES)], random_state=42)
+    if engine == "linear":
+        from sklearn.linear_model import Ridge
+
+        return Ridge(alpha=1.0)
+    from sklearn.ensemble import RandomForestRegressor
+
+    return RandomForestRegressor(n_estimators=200, max_depth=10, random_state=42)
+
+
+def build_preprocessor(scale=True, encoding="onehot"):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    # Trees only compare values, so scaling does not change the forest (scale=False skips it)
+    numeric_transformer = Pipeline(steps=[
+        ("scaler", StandardScaler() if scale else "passthrough")
+    ])
+    if encoding == "ordinal":
+        # Unknown archetypes become -1, which HistGradientBoosting treats as missing
+        encoder = ("ordinal", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1))
+    else:
+        encoder = ("onehot", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+    categorical_transformer = Pipeline(steps=[encoder])
+    return ColumnTransformer(
+        transformers=[
+            ("num", numeric_transformer, NUMERIC_FEATURES),
+            ("cat", categorical_transformer, CATEGORICAL_FEATURES)
+        ],
+        remainder="passthrough"
+    )
+
+
+def build_pipeline(scale=True, memory=None, engine=DEFAULT_ENGINE):
+    from sklearn.pipeline import Pipeline
+
+    #Join Preprocessor -> Regressor (Random forest by default, see ENGINES)
+    # memory: cache of the fitted preprocessor (joblib), shared by every candidate of the search
+    config = ENGINES[engine]
+    return Pipeline(steps=[
+        ("preprocessor", build_preprocessor(scale or config["scaling"], config["encoding"])),
+        ("regressor", build_regressor(engine))
+    ], memory=memory)
+
+
+def split(df):
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(df[FEATURES], df[TARGET], test_size=0.2, random_state=42)
+
+
+class FoldPredictionRecorder:
+    # neg_mean_absolute_error scorer that also saves the predictions of every (candidate, fold)
+    # to disk, so the fold models' out-of-fold predictions survive the worker processes
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def __call__(self, estimator, X, y):
+        from sklearn.metrics import mean_absolute_error
+
+        predictions = estimator.predict(X)
+        fold = hashlib.sha256(np.asarray(X.index).tobytes()).hexdigest()[:16]
+        np.save(self.directory / f"{candidate_key(estimator)}_{fold}.npy",
+                np.column_stack([np.asarray(X.index, dtype=float), predictions]))
+        return -mean_absolute_error(y, predictions)
+
+
+def candidate_key(estimator):
+    params = estimator.named_steps["regressor"].get_params()
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def out_of_fold_predictions(random_search, X_train, directory):
+    # The best candidate's fold predictions, one per training row (None if some are missing,
+    # e.g. a halving search on n_samples whose last round did not use every row)
+    files = sorted(Path(directory).glob(f"{candidate_key(random_search.best_estimator_)}_*.npy"))
+    if not files:
+        return None
+    saved = np.vstack([np.load(f) for f in files])
+    oof = pd.Series(saved[:, 1], index=saved[:, 0].astype(np.int64)).groupby(level=0).last()
+    if not X_train.index.isin(oof.index).all():
+        return None
+    return oof.reindex(X_train.index)
+
+
+def search(X_train, Y_train, n_iter=50, cv=5, cache=True, scale=True, method="random",
+           resource=None, engine=DEFAULT_ENGINE):
+    import tempfile
+
+    from sklearn.model_selection import RandomizedSearchCV
+
+    # Only the regressor parameters are searched, so the preprocessor of a fold is the same
+    # for every candidate: with cache=True it is fitted once per fold and then read back
+    # from a temporary joblib cache (removed after the search).
+    # The scorer keeps the fold predictions: the best candidate's are the out-of-fold
+    # predictions of the training rows (random_search.oof_predictions_), at no extra fit.
+    with tempfile.TemporaryDirectory(prefix="rf_search_") as work_dir:
+        cache_dir, folds_dir = Path(work_dir) / "cache", Path(work_dir) / "folds"
+        folds_dir.mkdir()
+        scoring = FoldPredictionRecorder(folds_dir)
+        estimator = build_pipeline(scale=scale, memory=str(cache_dir) if cache else None, engine=engine)
+        if method == "halving":
+            random_search = halving_search(estimator, n_iter, cv, resource, engine, scoring)
+            print(f"Starting Successive Halving ({n_iter} candidates * {cv} folds, "
+                  f"resource: {random_search.resource})...")
+        else:
+            random_search = RandomizedSearchCV(
+                estimator=estimator,
+                param_distributions=param_distributions(engine),
+                n_iter=n_iter,
+                cv=cv,
+                scoring=scoring,
+                random_state=42,
+                n_jobs=-1
+            )
+            print(f"Starting Randomized Search ({n_iter} iterations * {cv} folds)...")
+        random_search.fit(X_train, Y_train)
+        # The refitted model must not point to the deleted cache
+        random_search.best_estimator_.memory = None
+        random_search.oof_predictions_ = out_of_fold_predictions(random_search, X_train, folds_dir)
+    print("\n--- Optimal Parameters Found ---")
+    print(random_search.best_params_)
+    return random_search
+
+
+def halving_search(estimator, n_candidates=50, cv=5, resource=None, engine=DEFAULT_ENGINE,
+                   scoring='neg_mean_absolute_error'):
+    # Same candidates and scoring as the randomized search, but every round keeps only the
+    # best third and gives it 3x the resource: the trees (regressor__n_estimators, the last
+    # round close to the 500 of param_distributions; max_iter for hgb) or the training rows
+    # ("n_samples"). The refit forest has the trees of the last round.
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV
+
+    params = param_distributions(engine)
+    default, max_resources = ENGINES[engine]["resource"]
+    resource = resource or default
+    if resource == "n_samples":
+        limits = {"min_resources": "exhaust"}
+    else:
+        # The resource sets the number of trees, so it is not sampled
+        params.pop(resource, None)
+        # One round per factor of 3 in the candidates, starting low enough for the last round
+        # to get close to max_resources: 50 candidates -> 18, 54, 162 and 486 trees
+        n_rounds = 1
+        while 3 ** n_rounds <= n_candidates:
+            n_rounds += 1
+        limits = {"min_resources": max_resources // 3 ** (n_rounds - 1), "max_resources": max_resources}
+    return HalvingRandomSearchCV(
+        estimator=estimator,
+        param_distributions=params,
+        n_candidates=n_candidates,
+        resource=resource,
+        factor=3,
+        cv=cv,
+        scoring=scoring,
+        random_state=42,
+        n_jobs=-1,
+        **limits
+    )
+
+
+# Configurations compared by benchmark_search (keyword arguments of search)
+BENCHMARKS = {
+    "cache": [{"cache": False}, {"cache": True}, {"cache": True, "scale": False}],
+    "search": [{"method": "random"},
+               {"method": "halving", "resource": "regressor__n_estimators"},
+               {"method": "halving", "resource": "n_samples"}],
+}
+
+
+def benchmark_search(n_iter=10, cv=5, benchmark="cache"):
+    # Wall time and best MAE of the search in each configuration
+    import time
+
+    df = load_artifact("nba_data_with_archetypes")
+    X_train, X_test, Y_train, Y_test = split(df)
+    rows = []
+    for config in BENCHMARKS[benchmark]:
+        start = time.perf_counter()
+        random_search = search(X_train, Y_train, n_iter=n_iter, cv=cv, **config)
+        rows.append({"config": ", ".join(f"{k}={v}" for k, v in config.items()),
+                     "time_s": time.perf_counter() - start,
+                     "best_cv_mae_log": -random_search.best_score_,
+                     "test_mae": evaluate(random_search.best_estimator_, X_test, Y_test)["mae"]})
+    report = pd.DataFrame(rows)
+    print(report.to_markdown(index=False, floatfmt=(None, ".2f", ".4f", ",.0f")))
+    return report
+
+
+def compare_engines(n_iter=10, cv=5, engines=None):
+    # Same split, features and randomized search for every engine: accuracy next to the cost
+    # of training (search + final fit), predicting (1 row / the test set) and storing the model
+    import pickle
+    import time
+
+    df = load_artifact("nba_data_with_archetypes")
+    X_train, X_test, Y_train, Y_test = split(df)
+    rows = []
+    for engine in engines or ENGINES:
+        start = time.perf_counter()
+        random_search = search(X_train, Y_train, n_iter=n_iter, cv=cv, engine=engine)
+        search_s = time.perf_counter() - start
+        model = random_search.best_estimator_
+        start = time.perf_counter()
+        model.fit(X_train, Y_train)
+        train_s = time.perf_counter() - start
+
+        one_row = X_test.iloc[:1]
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            model.predict(one_row)
+            timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        model.predict(X_test)
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        metrics = evaluate(model, X_test, Y_test)
+        rows.append({"engine": engine, "search_s": search_s, "train_s": train_s,
+                     "predict_1_ms": np.median(timings) * 1000, "predict_batch_ms": batch_ms,
+                     "size_MB": len(pickle.dumps(model)) / 1e6, "r2": metrics["r2"], "mae": metrics["mae"]})
+    report = pd.DataFrame(rows)
+    print(f"\n--- Engines ({n_iter} candidates * {cv} folds, test set of {len(X_test)} players) ---")
+    print(report.to_markdown(index=False, floatfmt=(None, ".2f", ".3f", ".2f", ".2f", ".2f", ".4f", ",.0f")))
+    return report
+
+
+def evaluate(model, X_test, Y_test):
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    # Metrics in dollars, not in log scale
+    Y_pred_dollars = np.exp(model.predict(X_test)) - 1
+    Y_test_dollars = np.exp(Y_test) - 1
+    return {"r2": r2_score(Y_test_dollars, Y_pred_dollars),
+            "mae": mean_absolute_error(Y_test_dollars, Y_pred_dollars)}
+
+
+def add_value_gap(df, model, oof_predictions=None):
+    # oof_predictions: log predictions of the training rows by the fold models that did not
+    # see them (the other rows are the test set, which the final model did not see either).
+    # Without them every row is predicted by the final model, in-sample for 80% of players.
+    df = df.copy()
+    log_predictions = pd.Series(model.predict(df[FEATURES]), index=df.index)
+    df["Prediction_Source"] = IN_SAMPLE
+    if oof_predictions is not None:
+        log_predictions.loc[oof_predictions.index] = oof_predictions
+        df["Prediction_Source"] = np.where(df.index.isin(oof_predictions.index), "out-of-fold", "holdout")
+    df["Predicted_Salary"] = np.exp(log_predictions) - 1
+    # Value Gap: the core business metric (negative = underpaid)
+    df['Value_Gap'] = df['Salary'] - df['Predicted_Salary']
+    return df
+
+
+def interval_bounds(per_tree, coverage=INTERVAL_COVERAGE):
+    # Quantiles of a (rows x trees) matrix of log predictions, in dollars. NaN = tree not used
+    low, high = np.nanquantile(per_tree, [(1 - coverage) / 2, (1 + coverage) / 2], axis=1)
+    return np.exp(low) - 1, np.exp(high) - 1
+
+
+def add_prediction_intervals(df, model, train_index=None, coverage=INTERVAL_COVERAGE):
+    # Every tree of the forest is scored for every player in one pass (fast_forest.py).
+    # The training rows (train_index, in the order of the fit) only use the trees whose
+    # bootstrap sample did not contain them, like their out-of-fold point estimate.
+    # A gap is significant when the salary is outside the interval.
+    from fast_forest import CompiledForest
+
+    regressor = model.named_steps['regressor']
+    if not hasattr(regressor, 'estimators_') or not hasattr(regressor.estimators_[0], 'tree_'):
+        return df  # only forests have per-tree predictions
+    per_tree = CompiledForest.from_pipeline(model).predict_trees(df[FEATURES])
+    if train_index is not None and regressor.bootstrap:
+        samples = regressor.estimators_samples_
+        in_bag = np.zeros((len(train_index), len(samples)), dtype=bool)
+        in_bag[np.concatenate(samples), np.repeat(np.arange(len(samples)), [len(x) for x in samples])] = True
+        rows = df.index.get_indexer(train_index)
+        per_tree[rows] = np.where(in_bag, np.nan, per_tree[rows])
+
+    df = df.copy()
+    df['Predicted_Low'], df['Predicted_High'] = interval_bounds(per_tree, coverage)
+    df['Interval_Width'] = df['Predicted_High'] - df['Predicted_Low']
+    df['Significant_Gap'] = (df['Salary'] < df['Predicted_Low']) | (df['Salary'] > df['Predicted_High'])
+    return df
+
+
+def value_gap_reports(df, significant_only=False):
+    # (20 most underpaid, 20 most overpaid, value gap by archetype)
+    # significant_only: the top-20 lists skip players whose salary is inside their interval
+    ranked = df[df['Significant_Gap']] if significant_only and 'Significant_Gap' in df else df
+    bargain_targets = ranked.sort_values(by='Value_Gap', ascending=True).head(20)
+    overpaid_targets = ranked.sort_values(by='Value_Gap', ascending=False).head(20)
+    strategic_insight = (df.groupby('Player_Archetype')['Value_Gap'].agg(['mean', 'count', 'median'])
+                         .sort_values(by='mean', ascending=True)
+                         .rename(columns={'mean': 'Avg_Value_Gap', 'count': 'Player_Count',
+                                          'median': 'Median_Value_Gap'}))
+    return bargain_targets, overpaid_targets, strategic_insight
+
+
+def report_columns(df):
+    # The report columns, plus the interval width when the predictions have intervals
+    if 'Interval_Width' in df:
+        return REPORT_COLUMNS + ['Interval_Width'], REPORT_FLOATFMT + (",.0f",)
+    return REPORT_COLUMNS, REPORT_FLOATFMT
+
+
+def print_reports(bargain_targets, overpaid_targets, strategic_insight):
+    columns, floatfmt = report_columns(bargain_targets)
+    print("\n--- 1. TOP 20 UNDERVALUED TARGETS (The Agency's List) ---")
+    print(bargain_targets[columns].to_markdown(floatfmt=floatfmt))
+    print("\n--- 1. TOP 20 OVERPAID TARGETS (The Agency's List) ---")
+    print(overpaid_targets[columns].to_markdown(floatfmt=floatfmt))
+    listed = pd.concat([bargain_targets, overpaid_targets])
+    if 'Prediction_Source' in listed and listed['Prediction_Source'].nunique() > 1:
+        in_sample = listed.loc[listed['Prediction_Source'] == IN_SAMPLE, 'Player'].unique()
+        if len(in_sample):
+            print(f"In-sample predictions (every tree, not out-of-fold; intervals from every tree "
+                  f"too): {', '.join(in_sample)}")
+    print("\n--- 2. STRATEGIC INSIGHTS BY ARCHETYPE (Market Mispricing) ---")
+    print(strategic_insight.to_markdown(floatfmt=',.0f'))
+
+
+def run(n_iter=50, cv=5, cache=True, scale=True, method="random", resource=None, engine=DEFAULT_ENGINE,
+        in_sample=False, significant_only=False, importance=False):
+    df = load_artifact("nba_data_with_archetypes")
+    X_train, X_test, Y_train, Y_test = split(df)
+
+    random_search = search(X_train, Y_train, n_iter=n_iter, cv=cv, cache=cache, scale=scale,
+                           method=method, resource=resource, engine=engine)
+    best_rf_model = random_search.best_estimator_
+
+    metrics = evaluate(best_rf_model, X_test, Y_test)
+    print("\n--- Model Performance on Test Set ---")
+    print(f"R-squared (R²): {metrics['r2']:.4f}")
+    print(f"Mean Absolute Error (MAE): ${metrics['mae']:,.2f}")
+
+    from model_registry import register_model
+
+    oof = None if in_sample else random_search.oof_predictions_
+    # With --in-sample no out-of-fold predictions are saved, so score() stays in-sample too
+    meta = register_model(best_rf_model, X_train.assign(**{TARGET: Y_train}), FEATURES, TARGET,
+                          metrics=metrics, params=random_search.best_params_, engine=engine,
+                          oof_predictions=oof)
+    print(f"\nModel saved as version v{meta['version']:03d} (models/salary/)")
+
+    if importance:
+        # Permutation importance (importance.py), cached with the new version for the figure.
+        # Otherwise it is its own stage: `python cli.py importance`
+        from importance import run as importance_run
+
+        importance_run(meta["version"], plot=False)
+
+    if oof is None and not in_sample:
+        print("No complete out-of-fold predictions from the search: value gaps are in-sample")
+    df = add_value_gap(df, best_rf_model, oof)
+    df = add_prediction_intervals(df, best_rf_model, None if in_sample else X_train.index)
+    # Parquet for the pipeline + CSV copy for Tableau
+    save_artifact(df, "dataset_visualizations", csv=True)
+    print_reports(*value_gap_reports(df, significant_only))
+    return best_rf_model, df
+
+
+def score(version=None, significant_only=False):
+    # Value gaps and reports from a registered model: a load instead of a retrain
+    from model_registry import data_fingerprint, load_meta, load_model, load_oof_predictions
+
+    meta = load_meta(version)
+    model = load_model(meta["version"])
+    print(f"Scoring with model v{meta['version']:03d} ({meta['engine']}, trained {meta['created']})")
+    df = load_artifact("nba_data_with_archetypes")
+    # The saved out-of-fold predictions only apply to the data the model was trained on
+    X_train, _, Y_train, _ = split(df)
+    oof = None
+    if data_fingerprint(X_train.assign(**{TARGET: Y_train}), FEATURES + [TARGET]) == meta["data_fingerprint"]:
+        oof = load_oof_predictions(meta["version"])
+    if oof is None:
+        print("Training data changed (or no out-of-fold predictions saved): value gaps are in-sample")
+    df = add_value_gap(df, model, oof)
+    df = add_prediction_intervals(df, model, None if oof is None else X_train.index)
+    save_artifact(df, "dataset_visualizations", csv=True)
+    print_reports(*value_gap_reports(df, significant_only))
+    return df
+
+
+def lookup_predictions(players):
+    # Prediction-only path: read the saved predictions, no model and no scikit-learn.
+    # Names are matched like the joins in main.py (accents, suffixes, typos).
+    from names import NameIndex
+
+    df = load_artifact("dataset_visualizations", columns=REPORT_COLUMNS)
+    matches = NameIndex(df["Player"]).resolve(players)
+    found = [matches[name][0] for name in players if matches.get(name, (None,))[0] is not None]
+    missing = [name for name in players if matches.get(name, (None,))[0] is None]
+    if missing:
+        print(f"Not found: {', '.join(missing)}")
+    return df.set_index("Player").loc[found].reset_index()
@@ -0,0 +1,141 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifacts import load_artifact, save_artifact
+from salary_model import FEATURES, NUMERIC_FEATURES
+
+
+# What-if salary scenarios: "what would this player earn at +3 PTS and +5 minutes?" for many
+# players and many perturbations at once. A scenario is one delta per numeric feature (0 =
+# unchanged) and, optionally, another archetype. The (player x scenario) matrix is built with
+# NumPy repeats / tiles, never row by row, and scored by the registered pipeline in batches of
+# BATCH_ROWS (sklearn's tree traversal is fastest on large batches; the compiled forest is for
+# single rows). The result is long: one row per (player, scenario).
+
+BATCH_ROWS = 100_000
+KEEP_ARCHETYPE = None  # scenario archetype that leaves the player's own
+
+
+def scenario_grid(deltas, archetypes=None):
+    # Cartesian product of {feature: [deltas]} (and archetype overrides): one row per scenario
+    unknown = set(deltas) - set(NUMERIC_FEATURES)
+    if unknown:
+        raise ValueError(f"Not numeric model features: {sorted(unknown)}")
+    if deltas:
+        mesh = np.meshgrid(*[np.asarray(values, dtype=float) for values in deltas.values()], indexing="ij")
+        grid = pd.DataFrame({feature: values.ravel() for feature, values in zip(deltas, mesh)})
+    else:
+        grid = pd.DataFrame(index=range(1))
+    if archetypes:
+        grid = grid.loc[grid.index.repeat(len(archetypes))].reset_index(drop=True)
+        grid["Archetype_Override"] = np.tile(np.asarray(archetypes, dtype=object), len(grid) // len(archetypes))
+    grid.index.name = "Scenario"
+    return grid
+
+
+def build_scenarios(players, grid):
+    # Model rows of every (player, scenario): player i, scenario j is row i * len(grid) + j.
+    # Features that are never negative in the base data are floored at 0.
+    n_players, n_scenarios = len(players), len(grid)
+    base = players[FEATURES].reset_index(drop=True)
+    rows = base.iloc[np.repeat(np.arange(n_players), n_scenarios)].reset_index(drop=True)
+    delta_columns = [c for c in grid.columns if c in NUMERIC_FEATURES]
+    if delta_columns:
+        floor = np.where(base[delta_columns].min().to_numpy() >= 0, 0.0, -np.inf)
+        values = rows[delta_columns].to_numpy(dtype=float) + np.tile(grid[delta_columns].to_numpy(), (n_players, 1))
+        rows[delta_columns] = np.maximum(values, floor)
+    if "Archetype_Override" in grid:
+        override = np.tile(grid["Archetype_Override"].to_numpy(), n_players)
+        keep = pd.isna(override)
+        rows["Player_Archetype"] = np.where(keep, rows["Player_Archetype"].to_numpy(), override)
+    return rows
+
+
+def predict_in_batches(model, rows, batch_rows=BATCH_ROWS):
+    # Predicted salaries in dollars, scored BATCH_ROWS rows at a time (bounded memory)
+    log_salary = np.concatenate([model.predict(rows.iloc[start:start + batch_rows])
+                                 for start in range(0, len(rows), batch_rows)])
+    return np.exp(log_salary) - 1
+
+
+def run_scenarios(model, players, grid, batch_rows=BATCH_ROWS):
+    # Long table: Player, Scenario, the deltas, the archetype used, Salary, the base
+    # prediction (no change) and the scenario's prediction
+    rows = build_scenarios(players, grid)
+    predicted = predict_in_batches(model, rows, batch_rows)
+    base_predicted = predict_in_batches(model, players[FEATURES], batch_rows)
+
+    n_players, n_scenarios = len(players), len(grid)
+    result = grid.reset_index().iloc[np.tile(np.arange(n_scenarios), n_players)].reset_index(drop=True)
+    result.insert(0, "Player", np.repeat(players["Player"].to_numpy(), n_scenarios))
+    result["Player_Archetype"] = rows["Player_Archetype"].to_numpy()
+    if "Salary" in players:
+        result["Salary"] = np.repeat(players["Salary"].to_numpy(), n_scenarios)
+    result["Base_Predicted_Salary"] = np.repeat(base_predicted, n_scenarios)
+    result["Predicted_Salary"] = predicted
+    result["Salary_Change"] = result["Predicted_Salary"] - result["Base_Predicted_Salary"]
+    return result
+
+
+def parse_delta(text):
+    # "PTS=-3:3:1" (start:stop:step, stop included) or "Minutes Played=0,5,10"
+    feature, _, values = text.rpartition("=")
+    if not feature:
+        raise argparse.ArgumentTypeError(f"Expected FEATURE=VALUES, got {text!r}")
+    if ":" in values:
+        start, stop, step = (float(v) for v in values.split(":"))
+        return feature, np.round(np.arange(start, stop + step / 2, step), 10).tolist()
+    return feature, [float(v) for v in values.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="What-if salary scenarios for many players at once.")
+    parser.add_argument("--delta", type=parse_delta, action="append", default=[],
+                        help='Deltas of a numeric feature, e.g. "PTS=-3:3:1" or "Minutes Played=0,5,10".')
+    parser.add_argument("--archetype", action="append", default=None,
+                        help="Archetype override (repeatable); 'keep' = the player's own.")
+    parser.add_argument("--players", nargs="+", default=None, help="Player names (default: every player).")
+    parser.add_argument("--version", type=int, default=None, help="Salary model version (default: latest).")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--output", default="salary_scenarios", help="Output artifact name.")
+    args = parser.parse_args(argv)
+
+    from model_registry import load_meta, load_model
+
+    players = load_artifact("nba_data_with_archetypes")
+    archetypes = None
+    if args.archetype:
+        archetypes = [KEEP_ARCHETYPE if a == "keep" else a for a in args.archetype]
+        unknown = set(archetypes) - set(players["Player_Archetype"]) - {KEEP_ARCHETYPE}
+        if unknown:
+            parser.error(f"Unknown archetypes: {sorted(unknown)}")
+    if args.players:
+        from names import NameIndex
+
+        matches = NameIndex(players["Player"]).resolve(args.players)
+        found = [match for match, _ in matches.values() if match is not None]
+        missing = [name for name, (match, _) in matches.items() if match is None]
+        if missing:
+            print(f"Not found: {', '.join(missing)}")
+        players = players[players["Player"].isin(found)]
+    grid = scenario_grid(dict(args.delta), archetypes)
+
+    meta = load_meta(args.version)
+    model = load_model(meta["version"])
+    start = time.perf_counter()
+    result = run_scenarios(model, players, grid, args.batch_rows)
+    elapsed = time.perf_counter() - start
+    print(f"{len(players)} players x {len(grid)} scenarios = {len(result):,} rows scored with model "
+          f"v{meta['version']:03d} in {elapsed:.2f} s")
+    save_artifact(result, args.output)
+    print(f"Saved to 'data/{args.output}.parquet'")
+    summary = result.groupby("Scenario")["Salary_Change"].mean().rename("Avg_Salary_Change")
+    print(grid.join(summary).sort_values("Avg_Salary_Change", ascending=False).head(10)
+          .to_markdown(floatfmt=",.2f"))
+
+
+if __name__ == "__main__":
+    main()
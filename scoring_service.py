@@ -0,0 +1,318 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from fast_forest import CompiledForest, load_predictor
+from salary_model import CATEGORICAL_FEATURES
+
+
+# Local scoring service for the salary model (no external services, standard library only).
+# The registered model is loaded once; every request is a list of player rows with the model
+# features (plus Salary / Player when known). Requests that arrive together are grouped
+# into one micro-batch: a single vectorized predict and one np.exp(...) - 1 for all of them.
+#
+#   POST /predict  {"rows": [{"Player": ..., "Salary": ..., "PTS": ..., ...}, ...]}
+#     -> {"predictions": [{"Player": ..., "Salary": ..., "Predicted_Salary": ..., "Value_Gap": ...}]}
+#     An empty list, or rows without every model feature (or with non-numeric values), get
+#     a 400 before they are batched; a request that fails in scoring gets a 500 without failing its batch.
+#   GET  /stats    p50/p99 latency, throughput and batch sizes
+#   GET  /health
+#
+# Listens on 127.0.0.1:PORT, or on a Unix socket with --socket.
+
+DEFAULT_PORT = 8787
+MAX_BATCH_ROWS = 1024
+MAX_WAIT_MS = 2.0
+LATENCY_WINDOW = 10_000
+
+
+class MicroBatcher:
+    # Collects the pending requests for at most max_wait_ms (or max_rows) and scores them
+    # together in one background thread
+    def __init__(self, predict, features, max_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.predict = predict
+        self.features = features
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self.pending = queue.Queue()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def submit(self, rows):
+        # Rows are checked here, before they can share a batch with other requests
+        validate_rows(rows, self.features)
+        future = Future()
+        self.pending.put((time.perf_counter(), rows, future))
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self.pending.get()]
+            n_rows = len(batch[0][1])
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_rows:
+                try:
+                    item = self.pending.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_rows += len(item[1])
+            try:
+                self._score(batch)
+            except Exception:
+                # A failing batch is scored again request by request: only the requests
+                # that fail on their own get the error
+                for item in batch:
+                    try:
+                        self._score([item])
+                    except Exception as exc:
+                        item[2].set_exception(exc)
+
+    def _score(self, batch):
+        # Sets the results of every request of the batch, or raises without setting any
+        df = pd.concat([pd.DataFrame(rows) for _, rows, _ in batch], ignore_index=True)
+        # Back-transform of the whole batch at once
+        predicted = np.exp(self.predict(df[self.features])) - 1
+        salary = df["Salary"].to_numpy(dtype=float) if "Salary" in df else np.full(len(df), np.nan)
+        gap = salary - predicted
+        player = df["Player"].tolist() if "Player" in df else [None] * len(df)
+        results = []
+        start = 0
+        for _, rows, _ in batch:
+            end = start + len(rows)
+            results.append([
+                {"Player": player[i], "Salary": _number(salary[i]),
+                 "Predicted_Salary": float(predicted[i]), "Value_Gap": _number(gap[i])}
+                for i in range(start, end)])
+            start = end
+        done = time.perf_counter()
+        for (received, _, future), result in zip(batch, results):
+            future.set_result(result)
+            with self.lock:
+                self.latencies.append(done - received)
+        with self.lock:
+            self.batch_sizes.append(len(df))
+            self.requests += len(batch)
+            self.rows += len(df)
+
+    def stats(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            elapsed = time.perf_counter() - self.started
+            return {
+                "requests": self.requests,
+                "rows": self.rows,
+                "batches": len(self.batch_sizes),
+                "mean_batch_rows": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+                "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+                "requests_per_s": self.requests / elapsed,
+                "rows_per_s": self.rows / elapsed,
+            }
+
+
+def _number(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_rows(rows, features):
+    # ValueError (-> HTTP 400) unless rows is a non-empty list of records with every model
+    # feature: numbers for the numeric ones, strings for the categorical ones; Salary a number or absent
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError("'rows' must be a list of objects")
+    if not rows:
+        raise ValueError("'rows' is empty")
+    for i, row in enumerate(rows):
+        missing = [f for f in features if f not in row]
+        if missing:
+            raise ValueError(f"row {i}: missing features {missing}")
+        wrong = [f for f in features
+                 if not (isinstance(row[f], str) if f in CATEGORICAL_FEATURES else _is_number(row[f]))]
+        if wrong:
+            raise ValueError(f"row {i}: wrong type for {wrong}")
+        if row.get("Salary") is not None and not _is_number(row["Salary"]):
+            raise ValueError(f"row {i}: Salary must be a number")
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Keep-alive: a client sends many requests on one connection
+    protocol_version = "HTTP/1.1"
+    batcher = None  # set by make_server
+    info = {}
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, self.batcher.stats())
+        elif self.path == "/health":
+            self._reply(200, dict(self.info, status="ok"))
+        else:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._reply(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            future = self.batcher.submit(payload["rows"])
+        except (ValueError, KeyError, TypeError) as exc:
+            self._reply(400, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        try:
+            predictions = future.result()
+        except Exception as exc:
+            self._reply(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+        self._reply(200, {"predictions": predictions})
+
+    def address_string(self):
+        # Unix socket clients have no (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TCPServer(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(port=DEFAULT_PORT, unix_socket=None, version=None, compiled=True,
+                max_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+    predictor, meta = load_predictor(version, compiled)
+    kind = "compiled forest" if isinstance(predictor, CompiledForest) else "sklearn pipeline"
+    handler = type("Handler", (ScoringHandler,), {
+        "batcher": MicroBatcher(predictor.predict, meta["features"], max_rows, max_wait_ms),
+        "info": {"model_version": meta["version"], "engine": meta["engine"], "predictor": kind},
+    })
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        return UnixHTTPServer(unix_socket, handler)
+    return TCPServer(("127.0.0.1", port), handler)
+
+
+#-- LOAD TEST --
+class UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def _connection(port, unix_socket):
+    return UnixHTTPConnection(unix_socket) if unix_socket else HTTPConnection("127.0.0.1", port)
+
+
+def request(method, path, payload=None, port=DEFAULT_PORT, unix_socket=None, connection=None):
+    conn = connection or _connection(port, unix_socket)
+    body = json.dumps(payload).encode() if payload is not None else None
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    return json.loads(conn.getresponse().read())
+
+
+def load_test(rows, n_requests=2000, concurrency=32, rows_per_request=1, port=DEFAULT_PORT, unix_socket=None):
+    # Many clients posting a few players each; client-side latency + the server's own stats
+    def client(requests_to_send):
+        conn = _connection(port, unix_socket)
+        latencies = []
+        for i in requests_to_send:
+            sample = [rows[(i * rows_per_request + j) % len(rows)] for j in range(rows_per_request)]
+            start = time.perf_counter()
+            request("POST", "/predict", {"rows": sample}, connection=conn)
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        chunks = np.array_split(np.arange(n_requests), concurrency)
+        latencies = np.concatenate([f.result() for f in [pool.submit(client, c) for c in chunks]]) * 1000
+    elapsed = time.perf_counter() - start
+    print(f"{n_requests} requests x {rows_per_request} rows, {concurrency} concurrent clients: "
+          f"{n_requests / elapsed:,.0f} req/s, client p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms")
+    server = request("GET", "/stats", port=port, unix_socket=unix_socket)
+    print(f"Server: {server['batches']} batches (mean {server['mean_batch_rows']:.1f} rows), "
+          f"p50 {server['p50_ms']:.2f} ms, p99 {server['p99_ms']:.2f} ms")
+    return latencies, server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local micro-batching scoring service for the salary model.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", default=None, help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument("--version", type=int, default=None, help="Model version (default: latest).")
+    parser.add_argument("--sklearn", action="store_true", help="Use the sklearn pipeline, not the compiled forest.")
+    parser.add_argument("--max-batch-rows", type=int, default=MAX_BATCH_ROWS)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--load-test", action="store_true",
+                        help="Start the service in the background, send requests built from the "
+                             "current players and report latency and throughput.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rows-per-request", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.port, args.socket, args.version, not args.sklearn,
+                         args.max_batch_rows, args.max_wait_ms)
+    info = server.RequestHandlerClass.info
+    where = args.socket or f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Serving model v{info['model_version']:03d} ({info['predictor']}) on {where}")
+    if not args.load_test:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print(json.dumps(server.RequestHandlerClass.batcher.stats(), indent=1))
+        return
+
+    from artifacts import load_artifact
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    columns = ["Player", "Salary"] + server.RequestHandlerClass.batcher.features
+    players = load_artifact("nba_data_with_archetypes", columns=columns)
+    rows = json.loads(players.to_json(orient="records"))
+    load_test(rows, args.requests, args.concurrency, args.rows_per_request,
+              port=server.server_address[1] if not args.socket else None, unix_socket=args.socket)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,118 +1,246 @@
-
-import requests
-import pandas as pd
+import argparse
+import threading
 import time
-from bs4 import BeautifulSoup, Comment
-
-
-# --- 1. OBTENER ESTADÍSTICAS DE JUGADORES POR PARTIDO ---
-stats_per_game_url = 'https://www.basketball-reference.com/leagues/NBA_2025_per_game.html'
-stats_per_game_csv_filename = 'nba_stats_per_game_regular_season.csv'
-
-print(f"Obteniendo datos de estadísticas desde: {stats_per_game_url}")
-try:
-    stats_tables_list = pd.read_html(stats_per_game_url)
-    stats_df_raw = stats_tables_list[0]
-    stats_df_raw.to_csv(stats_per_game_csv_filename, index=False)
-    print(f"Éxito. Datos de estadísticas guardados en: {stats_per_game_csv_filename}")
-except Exception as e:
-    print(f"Error al obtener datos de Basketball-Reference: {e}")
-
-print("\n" + "-" * 30 + "\n")
-time.sleep(2)
-
-#-- OBTENER ESTADÍSTICAS AVANZADAS --
-# --- Configuration ---
-url = "https://www.basketball-reference.com/leagues/NBA_2025_advanced.html"
-csv_filename = "nba_advanced_stats_2025.csv"
-
-print(f"Scraping Advanced Stats from: {url}")
-
-try:
-    # 1. Read the HTML table directly into a list of DataFrames
-    # This function grabs all <table> elements on the page.
-    tables = pd.read_html(url)
-
-    # 2. Select the first table
-    # The 'Advanced' stats table is the main table on this page.
-    advanced_df = tables[0]
-
-    print(f"Table found with {len(advanced_df)} rows.")
-
-    # 3. Clean the Data (Remove Repeated Headers)
-    # Basketball-Reference repeats the header row (Rk, Player, Pos...) every 20 rows.
-    # We simply filter out rows where the 'Rk' column equals the string 'Rk'.
-
-
-    # 4. Save to CSV
-    advanced_df.to_csv(csv_filename, index=False)
-
-    print("\n--- SUCCESS ---")
-    print(f"Cleaned data saved to '{csv_filename}'")
-    print(f"Final row count: {len(advanced_df)}")
-    print(advanced_df.head().to_markdown(index=False))
-
-except Exception as e:
-    print(f"\n--- ERROR ---")
-    print(f"Failed to scrape data: {e}")
-    print("Make sure you have 'lxml' installed (pip install lxml).")
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlparse
 
-# -- OBTENER LOS ENFRENTAMIENTOS ENTRE EQUIPOS
-url = "https://www.basketball-reference.com/leagues/NBA_2025_standings.html"
-csv_filename = "expanded_standings.csv"
-response = requests.get(url)
-soup = BeautifulSoup(response.content, 'html.parser')
-
-# Find all comments in the HTML
-comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-
-target_table = None
-
-# Loop through comments to find the one hiding our table
-for comment in comments:
-    if 'id="expanded_standings"' in comment:
-        # This comment contains our table!
-        # Parse the HTML *inside* the comment
-        comment_soup = BeautifulSoup(comment, 'html.parser')
-        target_table = comment_soup.find('table', id='expanded_standings')
-        break
-
-if target_table:
-    # Use pandas to read the table HTML directly
-    df = pd.read_html(str(target_table))[0]
-
-    df.to_csv(csv_filename, index=False)
-
-    print(df.head())
-else:
-    print("Table not found in comments.")
-
-
-# -- OBTENER LOS SALARIOS DE LOS JUGADORES
-
-# 1. Define the URL
-# This page contains the salaries for the 2024-2025 season
-salary_url = "https://www.basketball-reference.com/contracts/players.html"
-csv_filename = "nba_salaries_2024_2025_raw.csv"
-
-print(f"Attempting to scrape: {salary_url}")
-
-try:
-    # 2. Use pandas to read the HTML table directly
-    # We assume the header is on the second row (header=1) to handle the multi-level headers
-    tables = pd.read_html(salary_url, header=1)
-
-    # The first table is the one we want
-    salary_df = tables[0]
-
-    # 4. Save to CSV
-    salary_df.to_csv(csv_filename, index=False)
-
-    print("\n--- SUCCESS ---")
-    print(f"Data saved to '{csv_filename}'")
-    print(f"Rows scraped: {len(salary_df)}")
-    print(salary_df[['Player', '2025-26']].head().to_markdown(index=False))
-
-except Exception as e:
-    print(f"Error: {e}")
-    print("If this fails, try Solution 2 (Manual Download).")
\ No newline at end of file
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from response_cache import ResponseCache
+from tables import extract_table
+
+
+BASE_URL = "https://www.basketball-reference.com"
+CURRENT_SEASON = 2025
+
+# Pages we know how to scrape and the id of the table we keep from each one.
+# "contracts" only exists for the current season, so its path has no {season}.
+PAGE_TYPES = {
+    "per_game": {
+        "path": "/leagues/NBA_{season}_per_game.html",
+        "filename": "nba_stats_per_game_regular_season.csv",
+        "table_id": "per_game_stats",
+    },
+    "advanced": {
+        "path": "/leagues/NBA_{season}_advanced.html",
+        "filename": "nba_advanced_stats_{season}.csv",
+        "table_id": "advanced",
+    },
+    "standings": {
+        "path": "/leagues/NBA_{season}_standings.html",
+        "filename": "expanded_standings.csv",
+        "table_id": "expanded_standings",
+    },
+    "contracts": {
+        "path": "/contracts/players.html",
+        "filename": "nba_salaries_2024_2025_raw.csv",
+        "table_id": "player-contracts",
+    },
+}
+
+# Basketball-Reference blocks clients that go above ~20 requests per minute
+DEFAULT_RATE = 0.3   # tokens (requests) per second, per host
+DEFAULT_BURST = 2
+DEFAULT_WORKERS = 4
+# The current season changes at most once a day
+DEFAULT_CACHE_TTL_HOURS = 24
+
+
+#-- RATE LIMITING --
+class TokenBucket:
+    # Thread-safe token bucket: `rate` tokens per second, at most `capacity` stored.
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+#-- HTTP SESSION --
+class Scraper:
+    # One pooled session shared by every worker, with one token bucket per host.
+    # With a ResponseCache, fresh pages are served from disk and stale ones are revalidated.
+    def __init__(self, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=DEFAULT_BURST, cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.rate = rate
+        self.burst = burst
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+    def get(self, url, **kwargs):
+        self.bucket_for(url).acquire()
+        response = self.session.get(url, timeout=30, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def fetch(self, url, ttl=None):
+        # Returns the body (bytes) of `url`, going to the network only when needed
+        if self.cache is None:
+            return self.get(url).content
+        body, meta = self.cache.load(url)
+        if body is not None and self.cache.is_fresh(meta, ttl):
+            self.cache.count("hits")
+            self.cache.count("bytes_saved", len(body))
+            return body
+        headers = self.cache.conditional_headers(meta) if meta else {}
+        response = self.get(url, headers=headers)
+        if response.status_code == 304 and body is not None:
+            self.cache.touch(url, meta)
+            self.cache.count("revalidated")
+            self.cache.count("bytes_saved", len(body))
+            return body
+        self.cache.store(url, response.content, response.headers)
+        self.cache.count("misses")
+        self.cache.count("bytes_downloaded", len(response.content))
+        return response.content
+
+    def close(self):
+        self.session.close()
+
+
+#-- PARSING --
+def parse_page(page, html):
+    # Only the table we need is parsed, even when it is hidden inside an HTML comment
+    # (standings). The standings keep their two header rows, like the original CSV.
+    return extract_table(html, PAGE_TYPES[page]["table_id"], multi_header=(page == "standings"))
+
+
+#-- JOBS --
+def build_jobs(seasons, pages, base_url=BASE_URL):
+    # One (page, season, url) job per page and season.
+    # The contracts page is not tied to a season, so it is fetched only once.
+    jobs = []
+    for page in pages:
+        path = PAGE_TYPES[page]["path"]
+        if "{season}" not in path:
+            jobs.append((page, None, base_url + path))
+            continue
+        for season in seasons:
+            jobs.append((page, season, base_url + path.format(season=season)))
+    return jobs
+
+
+def output_path(out_dir, page, season, nested):
+    filename = PAGE_TYPES[page]["filename"].format(season=season or CURRENT_SEASON)
+    if nested and season is not None:
+        return Path(out_dir) / str(season) / filename
+    return Path(out_dir) / filename
+
+
+def cache_ttl(season, ttl_hours):
+    # Past seasons never change: cache them forever (ttl=None).
+    # The current season and the contracts page (season=None) expire after ttl_hours.
+    if season is not None and season < CURRENT_SEASON:
+        return None
+    return ttl_hours * 3600
+
+
+def scrape_job(scraper, page, season, url, out_dir, nested, ttl_hours=DEFAULT_CACHE_TTL_HOURS):
+    body = scraper.fetch(url, ttl=cache_ttl(season, ttl_hours))
+    # Basketball-Reference serves UTF-8 (accents in player names)
+    df = parse_page(page, body.decode("utf-8", errors="replace"))
+    path = output_path(out_dir, page, season, nested)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    return path, len(df)
+
+
+def scrape(seasons, pages, out_dir=".", nested=False, workers=DEFAULT_WORKERS,
+           rate=DEFAULT_RATE, burst=DEFAULT_BURST, base_url=BASE_URL,
+           cache_dir=".http_cache", ttl_hours=DEFAULT_CACHE_TTL_HOURS):
+    jobs = build_jobs(seasons, pages, base_url)
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    scraper = Scraper(workers=workers, rate=rate, burst=burst, cache=cache)
+    results, errors = [], []
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(scrape_job, scraper, page, season, url, out_dir, nested, ttl_hours):
+                    (page, season, url)
+                for page, season, url in jobs
+            }
+            for future in as_completed(futures):
+                page, season, url = futures[future]
+                try:
+                    path, n_rows = future.result()
+                except Exception as e:
+                    print(f"Error al obtener {url}: {e}")
+                    errors.append((page, season, url, e))
+                    continue
+                print(f"Éxito. {page} {season or ''} ({n_rows} filas) guardado en: {path}")
+                results.append((page, season, path, n_rows))
+    finally:
+        scraper.close()
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(results)}/{len(jobs)} páginas en {elapsed:.1f}s ({len(errors)} errores)")
+    if cache is not None:
+        cache.report()
+    return results, errors
+
+
+def parse_seasons(value):
+    # "2025" -> [2025], "2016-2025" -> [2016, ..., 2025]
+    if "-" in value:
+        first, last = value.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(value)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Basketball-Reference tables.")
+    parser.add_argument("--seasons", type=parse_seasons, default=None,
+                        help="Season or range of seasons to backfill, e.g. 2016-2025. "
+                             "Without it only the current season is scraped (legacy layout).")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGE_TYPES), default=list(PAGE_TYPES))
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="Requests per second per host.")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST)
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="Point the scraper at another server (e.g. a local copy of saved pages).")
+    parser.add_argument("--cache-dir", default=".http_cache")
+    parser.add_argument("--cache-ttl-hours", type=float, default=DEFAULT_CACHE_TTL_HOURS,
+                        help="How long current-season pages stay fresh. Past seasons never expire.")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Backfill mode writes one sub-folder per season: <out-dir>/<season>/<file>.csv
+    nested = args.seasons is not None
+    seasons = args.seasons or [CURRENT_SEASON]
+    scrape(seasons, args.pages, out_dir=args.out_dir, nested=nested, workers=args.workers,
+           rate=args.rate, burst=args.burst, base_url=args.base_url,
+           cache_dir=None if args.no_cache else args.cache_dir, ttl_hours=args.cache_ttl_hours)
+
+
+if __name__ == "__main__":
+    main()
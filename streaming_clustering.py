@@ -0,0 +1,199 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from artifacts import DEFAULT_CHUNKSIZE, iter_artifact, iter_table, save_artifact
+from clustering import ARCHETYPE_NAMES, CLUSTERING_FEATURES, OPTIMAL_K
+
+
+# Out-of-core archetype clustering (the mini-batch engine next to k-means.py).
+# The player-seasons are read in chunks, three times:
+#   1. running StandardScaler statistics (partial_fit) + a reservoir sample of the rows,
+#      used to seed the centroids (k-means++ on the sample),
+#   2. MiniBatchKMeans.partial_fit over shuffled mini-batches of every chunk (`epochs` times),
+#   3. assignment of every row to its nearest centroid.
+# Peak memory depends on the chunk size and the reservoir, never on the number of rows,
+# so decades of player-seasons can be clustered. `--compare` runs the full-batch path of
+# k-means.py on the same data and reports time, peak memory and label agreement.
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_EPOCHS = 5
+RESERVOIR_SIZE = 20_000
+# Minimum share of players with the same archetype as the full-batch fit
+DEFAULT_TOLERANCE = 0.95
+
+
+class Reservoir:
+    # Uniform sample of a stream of rows (algorithm R, vectorized per chunk)
+    def __init__(self, size, seed=42):
+        self.size = size
+        self.rows = None
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, X):
+        if self.rows is None:
+            self.rows = np.empty((0, X.shape[1]))
+        free = max(0, self.size - len(self.rows))
+        self.rows = np.vstack([self.rows, X[:free]])
+        rest = X[free:]
+        if len(rest):
+            # Row i of the stream replaces a random slot with probability size / (i + 1)
+            positions = self.seen + free + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            keep = slots < self.size
+            self.rows[slots[keep]] = rest[keep]
+        self.seen += len(X)
+
+
+def feature_chunks(source, chunksize, columns=None):
+    # source: an artifact name (data/<name>.parquet or .csv) or a list of CSV/Parquet paths
+    columns = columns or CLUSTERING_FEATURES
+    if isinstance(source, str):
+        yield from iter_artifact(source, columns=columns, chunksize=chunksize)
+    else:
+        for path in source:
+            yield from iter_table(path, columns=columns, chunksize=chunksize)
+
+
+def stream_fit(source, k=OPTIMAL_K, chunksize=DEFAULT_CHUNKSIZE, batch_size=DEFAULT_BATCH_SIZE,
+               epochs=DEFAULT_EPOCHS, seed=42):
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    #-- PASS 1: SCALER + RESERVOIR --
+    scaler = StandardScaler()
+    reservoir = Reservoir(RESERVOIR_SIZE, seed=seed)
+    for chunk in feature_chunks(source, chunksize):
+        X = chunk[CLUSTERING_FEATURES].to_numpy(dtype=float)
+        scaler.partial_fit(X)
+        reservoir.add(X)
+    init = KMeans(n_clusters=k, random_state=seed, n_init=10).fit(scaler.transform(reservoir.rows))
+
+    #-- PASS 2: MINI-BATCH UPDATES --
+    # No random reassignment of small clusters: the seeds already come from a full k-means
+    kmeans = MiniBatchKMeans(n_clusters=k, init=init.cluster_centers_, n_init=1,
+                             batch_size=batch_size, reassignment_ratio=0, random_state=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        for chunk in feature_chunks(source, chunksize):
+            X = scaler.transform(chunk[CLUSTERING_FEATURES].to_numpy(dtype=float))
+            X = X[rng.permutation(len(X))]
+            for start in range(0, len(X), batch_size):
+                kmeans.partial_fit(X[start:start + batch_size])
+    return scaler, kmeans
+
+
+def stream_assign(source, scaler, kmeans, chunksize=DEFAULT_CHUNKSIZE):
+    #-- PASS 3: LABELS (one small int per row) --
+    labels, inertia = [], 0.0
+    for chunk in feature_chunks(source, chunksize):
+        X = scaler.transform(chunk[CLUSTERING_FEATURES].to_numpy(dtype=float))
+        dist = kmeans.transform(X)
+        labels.append(dist.argmin(axis=1).astype(np.int32))
+        inertia += (dist.min(axis=1) ** 2).sum()
+    return np.concatenate(labels), inertia
+
+
+def match_labels(reference_centers, centers):
+    # Cluster ids are arbitrary: map each mini-batch centroid to the closest full-batch one
+    from scipy.optimize import linear_sum_assignment
+
+    cost = ((centers[:, None, :] - reference_centers[None, :, :]) ** 2).sum(axis=2)
+    rows, cols = linear_sum_assignment(cost)
+    return dict(zip(rows, cols))
+
+
+def measure(func, *args, **kwargs):
+    # Wall time and peak Python/NumPy memory of one call
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def full_batch(source, k=OPTIMAL_K):
+    # Same fit as k-means.py, on the whole matrix
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+
+    X = pd.concat(feature_chunks(source, DEFAULT_CHUNKSIZE), ignore_index=True)[CLUSTERING_FEATURES]
+    scaler = StandardScaler()
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10).fit(scaler.fit_transform(X))
+    return scaler, kmeans
+
+
+def run_minibatch(source, k, chunksize, batch_size, epochs):
+    scaler, kmeans = stream_fit(source, k=k, chunksize=chunksize, batch_size=batch_size, epochs=epochs)
+    labels, inertia = stream_assign(source, scaler, kmeans, chunksize=chunksize)
+    return scaler, kmeans, labels, inertia
+
+
+def compare(source, k=OPTIMAL_K, chunksize=DEFAULT_CHUNKSIZE, batch_size=DEFAULT_BATCH_SIZE,
+            epochs=DEFAULT_EPOCHS, tolerance=DEFAULT_TOLERANCE):
+    from sklearn.metrics import adjusted_rand_score
+
+    (_, full), full_time, full_peak = measure(full_batch, source, k)
+    (scaler, kmeans, labels, inertia), mb_time, mb_peak = measure(
+        run_minibatch, source, k, chunksize, batch_size, epochs)
+
+    # Both scalers see the same rows, so the centroids live in the same space
+    mapping = match_labels(full.cluster_centers_, kmeans.cluster_centers_)
+    aligned = np.vectorize(mapping.get)(labels)
+    agreement = (aligned == full.labels_).mean()
+    report = pd.DataFrame({
+        "engine": ["KMeans (full batch)", "MiniBatchKMeans (streaming)"],
+        "time_s": [full_time, mb_time],
+        "peak_mem_MB": [full_peak / 1e6, mb_peak / 1e6],
+        "inertia": [full.inertia_, inertia],
+    })
+    print(report.to_markdown(index=False, floatfmt=(None, ".3f", ".2f", ",.1f")))
+    print(f"\nSame archetype as the full batch: {agreement:.1%} of {len(labels)} player-seasons "
+          f"(ARI {adjusted_rand_score(full.labels_, labels):.3f}, "
+          f"inertia {inertia / full.inertia_ - 1:+.1%})")
+    if agreement < tolerance:
+        print(f"WARNING: agreement below the tolerance ({tolerance:.0%}); "
+              f"try more --epochs or a larger --batch-size")
+    return aligned, agreement
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming (mini-batch) archetype clustering.")
+    parser.add_argument("--source", default="final_nba_dataset",
+                        help="Artifact name in data/ (default: final_nba_dataset).")
+    parser.add_argument("--paths", nargs="+", default=None,
+                        help="CSV/Parquet files with the player-seasons (instead of --source).")
+    parser.add_argument("--k", type=int, default=OPTIMAL_K)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--compare", action="store_true",
+                        help="Also run the full-batch KMeans and report time, memory and agreement.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", default="archetypes_minibatch", help="Output artifact name.")
+    args = parser.parse_args(argv)
+
+    source = args.paths or args.source
+    if args.compare:
+        labels, _ = compare(source, k=args.k, chunksize=args.chunksize, batch_size=args.batch_size,
+                            epochs=args.epochs, tolerance=args.tolerance)
+    else:
+        _, _, labels, _ = run_minibatch(source, args.k, args.chunksize, args.batch_size, args.epochs)
+
+    players = pd.concat(feature_chunks(source, args.chunksize, columns=["Player"]), ignore_index=True)
+    players["Archetype_ID"] = labels
+    # Aligned with the full-batch ids, so the K=8 names apply (only with --compare)
+    if args.compare and args.k == OPTIMAL_K:
+        players["Player_Archetype"] = players["Archetype_ID"].map(ARCHETYPE_NAMES)
+    save_artifact(players, args.output)
+    print(f"{len(players)} archetype labels saved to 'data/{args.output}.parquet'")
+
+
+if __name__ == "__main__":
+    main()
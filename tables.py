@@ -0,0 +1,89 @@
+import lxml.html
+import pandas as pd
+
+
+# Targeted table extraction for Basketball-Reference pages.
+# Instead of parsing the whole document (and every table in it), we locate the
+# <table id="..."> in the raw HTML and hand only that slice to lxml. This also
+# finds tables that Basketball-Reference hides inside HTML comments, because the
+# search runs on the raw text where the comment markers are just characters.
+
+def find_table_html(html, table_id):
+    marker = f'id="{table_id}"'
+    pos = html.find(marker)
+    while pos != -1:
+        start = html.rfind("<table", 0, pos)
+        # The id must belong to the <table ...> tag itself, not to a later element
+        if start != -1 and ">" not in html[start:pos]:
+            end = html.find("</table>", pos)
+            if end != -1:
+                return html[start:end + len("</table>")]
+        pos = html.find(marker, pos + len(marker))
+    raise ValueError(f"Table '{table_id}' not found.")
+
+
+def row_cells(tr):
+    # Expand colspan so every row has one entry per column
+    cells = []
+    for cell in tr.iterchildren("th", "td"):
+        text = cell.text_content().replace("\xa0", " ").strip()
+        cells.extend([text] * int(cell.get("colspan", 1)))
+    return cells
+
+
+def to_typed(df):
+    # Convert every column that is fully numeric (ignoring blanks) to a number
+    df = df.replace("", None)
+    for col in df.columns:
+        values = df[col]
+        converted = pd.to_numeric(values, errors="coerce")
+        if converted.notna().sum() == values.notna().sum():
+            df[col] = converted
+    return df
+
+
+def extract_table(html, table_id, multi_header=False):
+    # Returns the table as a DataFrame with typed columns.
+    # multi_header=True keeps the "over header" row (e.g. standings) as a column MultiIndex,
+    # otherwise only the last header row is used.
+    table = lxml.html.fragment_fromstring(find_table_html(html, table_id))
+
+    header_rows = [row_cells(tr) for tr in table.xpath("./thead/tr")]
+    body_rows = table.xpath("./tbody/tr")
+    if not header_rows:
+        # No <thead>: the first row is the header
+        all_rows = table.xpath(".//tr")
+        header_rows, body_rows = [row_cells(all_rows[0])], all_rows[1:]
+    header = header_rows[-1]
+
+    rows = []
+    for tr in body_rows:
+        # Basketball-Reference repeats the header row every 20 rows (class="thead")
+        if "thead" in (tr.get("class") or "").split():
+            continue
+        cells = row_cells(tr)
+        if not cells or cells in header_rows:
+            continue
+        # Pad / trim malformed rows so the frame stays rectangular
+        rows.append((cells + [""] * len(header))[:len(header)])
+
+    if multi_header and len(header_rows) > 1:
+        top = (header_rows[-2] + [""] * len(header))[:len(header)]
+        columns = pd.MultiIndex.from_arrays([top, header])
+    else:
+        columns = _dedupe(header)
+    return to_typed(pd.DataFrame(rows, columns=columns))
+
+
+def _dedupe(names):
+    # Same column name twice (e.g. empty spacer columns): suffix like pandas does (".1", ".2")
+    seen = {}
+    out = []
+    for name in names:
+        if name in seen:
+            seen[name] += 1
+            out.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            out.append(name)
+    return out
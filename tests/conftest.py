@@ -0,0 +1,60 @@
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# The modules live at the repository root (no package)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class FixtureServer:
+    # Local stand-in for Basketball-Reference: serves `pages` (path -> HTML) with an ETag,
+    # answers 304 to a matching If-None-Match and logs (path, status) of every request
+    def __init__(self):
+        self.pages = {}
+        self.log = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.pages.get(self.path)
+                if body is None:
+                    status = 404
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                else:
+                    body = body.encode("utf-8")
+                    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                    status = 304 if self.headers.get("If-None-Match") == etag else 200
+                    self.send_response(status)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0" if status == 304 else str(len(body)))
+                    self.end_headers()
+                    if status == 200:
+                        self.wfile.write(body)
+                server.log.append((self.path, status))
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def statuses(self, path):
+        return [status for logged, status in self.log if logged == path]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fixture_server():
+    server = FixtureServer()
+    yield server
+    server.close()
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+import cleaning
+from aggregate import add_age, aggregate_game_logs
+
+PLAYERS = {"p1": ("Alpha Guard", "BOS"), "p2": ("Beta Center", "LAL")}
+ADVANCED_STATS = ["PER", "TS%", "3PAr", "TRB%", "AST%", "STL%", "BLK%", "TOV%", "USG%", "WS", "BPM", "VORP"]
+
+
+def game_logs(season, points):
+    rows = []
+    for player_id, (player, team) in PLAYERS.items():
+        for game in range(3):
+            rows.append({"Season": season, "Date": f"{season}-01-0{game + 1}", "player_id": player_id,
+                         "Player": player, "Team": team, "Status": "Played", "MP": 30.0, "FG": 4,
+                         "FGA": 10, "3P": 1, "3PA": 4, "FT": 1, "FTA": 2, "PTS": points})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def tables(tmp_path, monkeypatch):
+    # Advanced stats, standings and salaries of the 2025 season only
+    advanced = pd.DataFrame([dict({s: 1.0 for s in ADVANCED_STATS}, Player=player, Age=25 + i, Team=team, G=3)
+                             for i, (player, team) in enumerate(PLAYERS.values())])
+    advanced.to_csv(tmp_path / "nba_advanced_stats_2025.csv", index=False)
+    (tmp_path / "standings.csv").write_text(
+        ",,\nRk,Team,Overall\n1,Boston Celtics,61-21\n2,Los Angeles Lakers,50-32\n")
+    pd.DataFrame({"Player": [p for p, _ in PLAYERS.values()], "2025-26": ["$30,000,000", "$20,000,000"]}).to_csv(
+        tmp_path / "salaries.csv", index=False)
+    monkeypatch.setattr(cleaning, "ADVANCED_STATS_FILE", str(tmp_path / "nba_advanced_stats_2025.csv"))
+    monkeypatch.setattr(cleaning, "STANDINGS_FILE", str(tmp_path / "standings.csv"))
+    monkeypatch.setattr(cleaning, "SALARIES_FILE", str(tmp_path / "salaries.csv"))
+    return tmp_path
+
+
+def test_clean_keeps_the_advanced_table_season(tables):
+    # Two seasons of game logs: the final dataset has the 2025 stats and ages, not the earliest season's
+    paths = []
+    for season, points in [(2024, 10), (2025, 30)]:
+        path = tables / f"gamelogs_{season}.csv"
+        game_logs(season, points).to_csv(path, index=False)
+        paths.append(path)
+    per_game = add_age(aggregate_game_logs(paths), cleaning.ADVANCED_STATS_FILE)
+    assert len(per_game) == 4
+    per_game.to_csv(tables / "per_game.csv", index=False)
+
+    _, final = cleaning.build_dataset(str(tables / "per_game.csv"))
+    final = final.set_index("Player")
+    assert len(final) == len(PLAYERS)
+    assert (final["PTS"] == 30).all()
+    assert final["Age"].to_dict() == {"Alpha Guard": 25, "Beta Center": 26}
+    assert "Season" not in final.columns
+
+
+def test_aggregate_season_filter(tables):
+    path = tables / "gamelogs.csv"
+    pd.concat([game_logs(2024, 10), game_logs(2025, 30)]).to_csv(path, index=False)
+    out = aggregate_game_logs([path], season=2025)
+    assert set(out["Season"]) == {2025}
+    assert (out["PTS"] == 30).all()
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fast_forest import CompiledForest
+from model_registry import load_tree_arrays, pack_forest, preprocessing_params, register_model
+from salary_model import FEATURES, NUMERIC_FEATURES, TARGET, build_pipeline
+
+DATA = Path(__file__).resolve().parent.parent / "data" / "nba_data_with_archetypes.csv"
+
+
+@pytest.fixture(scope="module")
+def players():
+    return pd.read_csv(DATA)
+
+
+def with_missing(df, share=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    for column in NUMERIC_FEATURES:
+        df.loc[rng.random(len(df)) < share, column] = np.nan
+    return df
+
+
+def fit(X, y, scale):
+    model = build_pipeline(scale=scale)
+    model.set_params(regressor__n_estimators=25, regressor__n_jobs=1)
+    return model.fit(X, y)
+
+
+@pytest.mark.parametrize("scale", [True, False])
+def test_same_predictions_as_sklearn(players, scale):
+    model = fit(players[FEATURES], players[TARGET], scale)
+    compiled = CompiledForest.from_pipeline(model)
+    X = players[FEATURES]
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=0, atol=1e-10)
+    # NaN follows sklearn's missing-value child, even for a forest trained without NaN
+    X = with_missing(players[FEATURES])
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=0, atol=1e-10)
+
+
+def test_same_predictions_when_trained_with_missing_values(players):
+    X = with_missing(players[FEATURES], seed=1)
+    model = fit(X, players[TARGET], scale=True)
+    compiled = CompiledForest.from_pipeline(model)
+    for data in (X, with_missing(players[FEATURES], seed=2)):
+        np.testing.assert_allclose(compiled.predict(data), model.predict(data), rtol=0, atol=1e-10)
+
+
+def test_registry_round_trip(players, tmp_path):
+    model = fit(players[FEATURES], players[TARGET], scale=True)
+    meta = register_model(model, players[FEATURES + [TARGET]], FEATURES, TARGET, registry_dir=tmp_path)
+    compiled = CompiledForest(load_tree_arrays(meta["version"], registry_dir=tmp_path), meta["preprocessing"])
+    X = with_missing(players[FEATURES])
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=0, atol=1e-10)
+
+
+def test_rejects_missing_values_without_routing(players):
+    model = fit(players[FEATURES], players[TARGET], scale=True)
+    trees = pack_forest(model.named_steps["regressor"])
+    del trees["missing_left"]  # registry versions packed before it was stored
+    compiled = CompiledForest(trees, preprocessing_params(model))
+    compiled.predict(players[FEATURES])
+    with pytest.raises(ValueError, match="Missing values"):
+        compiled.predict(with_missing(players[FEATURES]))
@@ -0,0 +1,77 @@
+import json
+
+import pandas as pd
+
+import gamelogs
+
+SEASON = 2025
+PLAYERS = {"alphaal01": "Alpha Guard", "betabe01": "Beta Center", "gammaga01": "Gamma Forward"}
+
+
+def per_game_page(players):
+    rows = "".join(f'<tr><th>{i}</th><td data-append-csv="{player_id}">{name}</td></tr>'
+                   for i, (player_id, name) in enumerate(players.items(), start=1))
+    return (f'<table id="per_game_stats"><thead><tr><th>Rk</th><th>Player</th></tr></thead>'
+            f'<tbody>{rows}</tbody></table>')
+
+
+def game_log_page(points):
+    # One game per value; None = a game he missed (one cell across the stat columns)
+    header = "<tr><th>Rk</th><th>Date</th><th>Team</th><th></th><th>Opp</th><th>GS</th><th>MP</th><th>PTS</th></tr>"
+    rows = []
+    for game, pts in enumerate(points, start=1):
+        cells = f"<th>{game}</th><td>2025-01-0{game}</td><td>BOS</td><td>@</td><td>LAL</td>"
+        if pts is None:
+            rows.append(f'<tr>{cells}<td colspan="3">Inactive</td></tr>')
+        else:
+            rows.append(f"<tr>{cells}<td>1</td><td>30:30</td><td>{pts}</td></tr>")
+    return (f'<table id="player_game_log_reg"><thead>{header}</thead>'
+            f'<tbody>{"".join(rows)}</tbody></table>')
+
+
+def game_log_path(player_id):
+    return gamelogs.GAMELOG_PATH.format(letter=player_id[0], player_id=player_id, season=SEASON)
+
+
+def crawl(server, out_dir):
+    gamelogs.main(["--season", str(SEASON), "--out-dir", str(out_dir), "--base-url", server.url,
+                   "--no-cache", "--rate", "1000", "--burst", "100", "--retries", "0"])
+
+
+def test_parse_game_log_keeps_missed_games():
+    df = gamelogs.parse_game_log(game_log_page([20, None]), "alphaal01", "Alpha Guard", SEASON)
+    assert list(df["Status"]) == ["Played", "Inactive"]
+    assert df["MP"].iloc[0] == 30.5 and pd.isna(df["PTS"].iloc[1])
+
+
+def test_crawl_resumes_after_a_truncated_checkpoint(fixture_server, tmp_path):
+    fixture_server.pages[f"/leagues/NBA_{SEASON}_per_game.html"] = per_game_page(PLAYERS)
+    fixture_server.pages[game_log_path("alphaal01")] = game_log_page([20, None, 25])
+    fixture_server.pages[game_log_path("betabe01")] = game_log_page([8])
+    # gammaga01 has no page (404): checkpointed as missing, not an error
+
+    crawl(fixture_server, tmp_path)
+    csv_path = tmp_path / f"gamelogs_{SEASON}.csv"
+    checkpoint = tmp_path / f"gamelogs_{SEASON}.checkpoint"
+    complete = pd.read_csv(csv_path)
+    entries = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert {e["player_id"]: e["status"] for e in entries} == {
+        "alphaal01": "ok", "betabe01": "ok", "gammaga01": "missing"}
+
+    # Crash after the first player: only its checkpoint line survives, and half of a later
+    # player's rows are already in the CSV
+    first = entries[0]
+    checkpoint.write_text(json.dumps(first) + "\n")
+    with open(csv_path, "a") as f:
+        f.write("betabe01,Beta Center,2025,1,2025-01-0")
+    fixture_server.log.clear()
+
+    crawl(fixture_server, tmp_path)
+    # Only the players after the checkpoint are fetched again
+    fetched = {path for path, _ in fixture_server.log if "/gamelog/" in path}
+    assert fetched == {game_log_path(p) for p in PLAYERS if p != first["player_id"]}
+    resumed = pd.read_csv(csv_path)
+    # Same rows, each player once, whatever the completion order
+    order = ["player_id", "Rk"]
+    assert resumed.sort_values(order, ignore_index=True).equals(complete.sort_values(order, ignore_index=True))
+    assert len(checkpoint.read_text().splitlines()) == len(PLAYERS)
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from incremental_gaps import ValueGapReports
+from salary_model import TARGET, value_gap_reports
+
+DATA = Path(__file__).resolve().parent.parent / "data" / "dataset_visualizations.csv"
+
+
+@pytest.fixture
+def scored():
+    return pd.read_csv(DATA)
+
+
+def predict(X):
+    # Stand-in model: log salary from points only
+    return 14 + X["PTS"].to_numpy() / 10
+
+
+def test_blank_cells_keep_the_current_value(scored):
+    reports = ValueGapReports(scored)
+    player = scored["Player"].iloc[0]
+    before = reports.df.loc[player].copy()
+    rescored = reports.apply(pd.DataFrame({"Player": [player], "Salary": [1e6], "PTS": [np.nan]}), predict)
+    assert rescored == 0
+    assert reports.df.at[player, "PTS"] == before["PTS"]
+    assert reports.df.at[player, "Predicted_Salary"] == before["Predicted_Salary"]
+    assert reports.df.at[player, "Value_Gap"] == 1e6 - before["Predicted_Salary"]
+    assert reports.df.at[player, TARGET] == pytest.approx(np.log(1e6 + 1))
+
+
+def test_new_player_matches_a_full_recompute(scored):
+    scored = scored.assign(Predicted_Low=scored["Predicted_Salary"] * 0.8,
+                           Predicted_High=scored["Predicted_Salary"] * 1.2)
+    scored["Significant_Gap"] = (scored["Salary"] < scored["Predicted_Low"]) | (scored["Salary"] > scored["Predicted_High"])
+    reports = ValueGapReports(scored)
+    new = scored.iloc[[0]].assign(Player="New Player", PTS=25.0).drop(columns=["Predicted_Salary", "Value_Gap", "Significant_Gap"])
+    assert reports.apply(new, predict) == 1
+    assert reports.df.at["New Player", "Predicted_Salary"] == pytest.approx(np.exp(16.5) - 1)
+    assert reports.df["Significant_Gap"].dtype == bool
+    bargains, overpaid, insight = reports.reports()
+    expected = value_gap_reports(reports.df.reset_index(drop=True))
+    assert list(bargains["Player"]) == list(expected[0]["Player"])
+    assert list(overpaid["Player"]) == list(expected[1]["Player"])
+    assert np.allclose(insight.sort_index()["Avg_Value_Gap"], expected[2].sort_index()["Avg_Value_Gap"])
+
+
+def test_invalid_deltas_are_rejected(scored):
+    reports = ValueGapReports(scored)
+    player = scored["Player"].iloc[0]
+    with pytest.raises(ValueError, match="more than once"):
+        reports.apply(pd.DataFrame({"Player": [player, player], "PTS": [1.0, 2.0]}), predict)
+    with pytest.raises(ValueError, match="Missing Salary"):
+        reports.apply(pd.DataFrame({"Player": ["Nobody"], "Salary": [1e6], "PTS": [3.0]}), predict)
+    assert reports.df.equals(ValueGapReports(scored).df)
@@ -0,0 +1,77 @@
+import pandas as pd
+
+import scrape
+from response_cache import ResponseCache
+
+PER_GAME_PATH = "/leagues/NBA_2025_per_game.html"
+STANDINGS_PATH = "/leagues/NBA_2025_standings.html"
+
+PER_GAME_PAGE = """<html><body>
+<table id="per_game_stats"><thead><tr><th>Rk</th><th>Player</th><th>Age</th><th>Team</th><th>PTS</th></tr></thead>
+<tbody>
+<tr><th>1</th><td data-append-csv="alphaal01">Alpha Guard</td><td>25</td><td>BOS</td><td>20.5</td></tr>
+<tr class="thead"><th>Rk</th><th>Player</th><th>Age</th><th>Team</th><th>PTS</th></tr>
+<tr><th>2</th><td data-append-csv="betabe01">Beta Center</td><td>31</td><td>LAL</td><td>8.0</td></tr>
+</tbody></table></body></html>"""
+
+# The standings table only exists inside an HTML comment, like on Basketball-Reference
+STANDINGS_PAGE = """<html><body><div id="all_expanded_standings"><!--
+<table id="expanded_standings"><thead>
+<tr><th></th><th></th><th></th><th colspan="2">Place</th></tr>
+<tr><th>Rk</th><th>Team</th><th>Overall</th><th>Home</th><th>Road</th></tr>
+</thead><tbody>
+<tr><th>1</th><td>Boston Celtics</td><td>61-21</td><td>36-5</td><td>25-16</td></tr>
+<tr><th>2</th><td>Los Angeles Lakers</td><td>50-32</td><td>31-10</td><td>19-22</td></tr>
+</tbody></table>
+--></div></body></html>"""
+
+
+def run_scrape(server, tmp_path, pages, *extra):
+    scrape.main(["--pages", *pages, "--out-dir", str(tmp_path / "out"), "--base-url", server.url,
+                 "--cache-dir", str(tmp_path / "cache"), "--rate", "1000", "--burst", "100", *extra])
+
+
+def test_cache_miss_hit_and_revalidation(fixture_server, tmp_path):
+    fixture_server.pages[PER_GAME_PATH] = PER_GAME_PAGE
+    output = tmp_path / "out" / scrape.PAGE_TYPES["per_game"]["filename"]
+
+    run_scrape(fixture_server, tmp_path, ["per_game"])
+    assert fixture_server.statuses(PER_GAME_PATH) == [200]
+    first = pd.read_csv(output)
+    assert list(first["Player"]) == ["Alpha Guard", "Beta Center"]
+
+    # Fresh: served from disk, no request
+    run_scrape(fixture_server, tmp_path, ["per_game"])
+    assert fixture_server.statuses(PER_GAME_PATH) == [200]
+
+    # Stale: revalidated with the ETag, the server answers 304 and the cached body is used
+    cache = ResponseCache(tmp_path / "cache")
+    url = fixture_server.url + PER_GAME_PATH
+    fetched_at = cache.load(url)[1]["fetched_at"]
+    run_scrape(fixture_server, tmp_path, ["per_game"], "--cache-ttl-hours", "0")
+    assert fixture_server.statuses(PER_GAME_PATH) == [200, 304]
+    assert pd.read_csv(output).equals(first)
+    assert cache.load(url)[1]["fetched_at"] > fetched_at
+
+    # A changed page is downloaded again
+    fixture_server.pages[PER_GAME_PATH] = PER_GAME_PAGE.replace("20.5", "21.5")
+    run_scrape(fixture_server, tmp_path, ["per_game"], "--cache-ttl-hours", "0")
+    assert fixture_server.statuses(PER_GAME_PATH) == [200, 304, 200]
+    assert list(pd.read_csv(output)["PTS"]) == [21.5, 8.0]
+
+
+def test_comment_hidden_table(fixture_server, tmp_path):
+    fixture_server.pages[STANDINGS_PATH] = STANDINGS_PAGE
+    run_scrape(fixture_server, tmp_path, ["standings"], "--no-cache")
+    # Two header rows, read back like cleaning.py does
+    standings = pd.read_csv(tmp_path / "out" / scrape.PAGE_TYPES["standings"]["filename"], header=1)
+    assert list(standings.columns) == ["Rk", "Team", "Overall", "Home", "Road"]
+    assert list(standings["Overall"]) == ["61-21", "50-32"]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_missing_page_is_reported(fixture_server, tmp_path):
+    results, errors = scrape.scrape([2025], ["advanced"], out_dir=tmp_path, base_url=fixture_server.url,
+                                    rate=1000, burst=100, cache_dir=None)
+    assert results == [] and len(errors) == 1
+    assert errors[0][:2] == ("advanced", 2025)